@@ -0,0 +1,22 @@
+import pygame
+
+class FrameAtlas:
+    """Process-wide cache of sliced, scaled and mirrored animation frames"""
+    def __init__(self):
+        # (sheet, animation) -> {'right': [frames], 'left': [frames]}
+        self.strips = {}
+
+    def strip(self, sheet, animation, image, rects, size):
+        """Slice, scale and flip an animation once; later calls are lookups"""
+        key = (sheet, animation)
+        if key not in self.strips:
+            right = [pygame.transform.scale(image.subsurface(rect), size) for rect in rects]
+            left = [pygame.transform.flip(frame, True, False) for frame in right]
+            self.strips[key] = {'right': right, 'left': left}
+        return self.strips[key]
+
+    def clear(self):
+        self.strips.clear()
+
+# Shared by every animated entity
+frame_atlas = FrameAtlas()
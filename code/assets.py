@@ -0,0 +1,125 @@
+import pygame
+import os
+import threading
+from collections import OrderedDict
+
+class AssetCache:
+    """Lazily loaded assets with least-recently-used eviction"""
+    def __init__(self, loader, capacity):
+        self.loader = loader
+        self.capacity = capacity
+        self.items = OrderedDict()
+        self.lock = threading.RLock()
+
+    def get(self, *key):
+        with self.lock:
+            if key in self.items:
+                self.items.move_to_end(key)
+                return self.items[key]
+            asset = self.loader(*key)
+            self.items[key] = asset
+            while len(self.items) > self.capacity:
+                self.items.popitem(last=False)
+            return asset
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.items
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+class AssetRegistry:
+    """Process-wide registry of images, sounds and fonts"""
+    def __init__(self):
+        self.images = AssetCache(self.load_image, 64)
+        self.sounds = AssetCache(self.load_sound, 32)
+        self.fonts = AssetCache(self.load_font, 16)
+        self.music_files = AssetCache(self.load_music, 4)
+        self.decoded = {}  # path -> image decoded by decode_image() and not yet converted
+
+    def image(self, path, size=None):
+        """Image converted for fast blitting, optionally scaled to size"""
+        return self.images.get(path, size)
+
+    def sound(self, path):
+        """Sound effect at full volume (players set the volume per channel), or None if it cannot be loaded"""
+        return self.sounds.get(path)
+
+    def decode_image(self, path):
+        """Read and decode an image file ahead of image() (safe on a worker thread; image() converts it)"""
+        if path not in self.decoded and (path, None) not in self.images:
+            self.decoded[path] = pygame.image.load(path)
+
+    def font(self, path, size):
+        return self.fonts.get(path, size)
+
+    def music(self, path):
+        """Raw bytes of a music track so pygame.mixer.music can stream it from memory, or None"""
+        return self.music_files.get(path)
+
+    def load_image(self, path, size):
+        if size:
+            return pygame.transform.scale(self.image(path), size)
+        image = self.decoded.pop(path, None) or pygame.image.load(path)
+        return image.convert_alpha()
+
+    def load_sound(self, path):
+        try:
+            if os.path.exists(path):
+                sound = pygame.mixer.Sound(path)
+                print(f"Loaded {os.path.basename(path)} sound from {path}")
+                return sound
+            print(f"Sound file not found: {path}")
+        except Exception as e:
+            print(f"Warning: Could not load {os.path.basename(path)} sound: {e}")
+        return None
+
+    def load_font(self, path, size):
+        return pygame.font.Font(path, size)
+
+    def load_music(self, path):
+        try:
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    return f.read()
+            print(f"Music file not found: {path}")
+        except OSError as e:
+            print(f"Warning: Could not read music {path}: {e}")
+        return None
+
+    def clear(self):
+        self.images.clear()
+        self.sounds.clear()
+        self.fonts.clear()
+        self.music_files.clear()
+        self.decoded.clear()
+
+class BackgroundLoader:
+    """Runs a loading job once on a daemon thread; the main thread polls ready()"""
+    def __init__(self, job):
+        self.job = job
+        self.error = None
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        try:
+            self.job()
+        except Exception as e:
+            # The main thread falls back to loading synchronously
+            self.error = e
+            print(f"Warning: Background loading failed: {e}")
+        finally:
+            self.done.set()
+
+    def ready(self):
+        return self.done.is_set()
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+# Shared by every entity and UI class
+assets = AssetRegistry()
@@ -0,0 +1,180 @@
+import pygame
+import io
+import os
+import math
+import time
+from collections import deque
+from code.assets import assets, BackgroundLoader
+from code.profiler import profiler
+from code.settings import *
+
+# name -> (path, volume)
+MUSIC_TRACKS = {
+    'background': (os.path.join('audio', 'background.mp3'), 0.2),
+    'boss': (os.path.join('audio', 'boss_fight.mp3'), 0.3),
+}
+
+class MusicManager:
+    """Owns pygame.mixer.music: tracks are read ahead on a worker thread and switched with a fade"""
+    def __init__(self, tracks=MUSIC_TRACKS, fade_ms=800):
+        self.tracks = tracks
+        self.fade_ms = fade_ms
+        self.loader = None  # Reads every track into memory once
+        self.current = None  # Track that is playing (or fading out)
+        self.pending = None  # Track waiting for the old one to fade out
+        self.requested_at = 0.0
+        self.transitions = deque(maxlen=20)  # (track, seconds from request until it started playing)
+
+    def preload(self):
+        """Start reading every track into memory in the background (safe to call repeatedly)"""
+        if self.loader is None:
+            self.loader = BackgroundLoader(lambda: [assets.music(path) for path, volume in self.tracks.values()])
+
+    def play(self, name):
+        """Switch to a track: the current one fades out and update() fades the new one in"""
+        if not pygame.mixer.get_init() or name not in self.tracks:
+            return
+        if name == self.pending or (name == self.current and self.pending is None):
+            return
+        self.preload()
+        self.pending = name
+        self.requested_at = time.perf_counter()
+        if pygame.mixer.music.get_busy():
+            pygame.mixer.music.fadeout(self.fade_ms)
+        self.update()
+
+    def update(self):
+        """Start the pending track once its data is in memory and the old track is silent; call every frame"""
+        if self.pending is None or not pygame.mixer.get_init():
+            return
+        if pygame.mixer.music.get_busy() or not self.loader.ready():
+            return
+        name, self.pending = self.pending, None
+        path, volume = self.tracks[name]
+        with profiler.section('music'):
+            data = assets.music(path)  # Already in memory, no file I/O here
+            if not data:
+                return
+            try:
+                pygame.mixer.music.load(io.BytesIO(data), os.path.splitext(path)[1][1:])
+                pygame.mixer.music.set_volume(volume)
+                pygame.mixer.music.play(-1, fade_ms=self.fade_ms)
+            except pygame.error as e:
+                print(f"Warning: Could not play {name} music: {e}")
+                return
+        self.current = name
+        self.transitions.append((name, time.perf_counter() - self.requested_at))
+        profiler.count('music switch ms', self.last_transition_ms())
+
+    def last_transition_ms(self):
+        """How long the latest switch took from request to the new track playing"""
+        return self.transitions[-1][1] * 1000 if self.transitions else 0.0
+
+# Shared by the menus and every Level
+music = MusicManager()
+
+# Who wins a contested voice: the player's own feedback first, then the boss, then the horde
+PRIORITY_PLAYER = 3
+PRIORITY_BOSS = 2
+PRIORITY_ENEMY = 1
+
+# name -> (path, volume, max simultaneous voices, priority); effects may share a file, which is loaded once
+SOUND_EFFECTS = {
+    'sword_slash': (os.path.join('audio', 'sword_slash.mp3'), 0.5, 2, PRIORITY_PLAYER),
+    'level_up': (os.path.join('audio', 'level_up.mp3'), 0.6, 1, PRIORITY_PLAYER),
+    'boss_slash': (os.path.join('audio', 'sword_slash.mp3'), 0.6, 1, PRIORITY_BOSS),
+    'torch_slash': (os.path.join('audio', 'torch_slash.mp3'), 0.4, 3, PRIORITY_ENEMY),
+}
+
+class Voice:
+    """One mixer channel and the effect it was last asked to play"""
+    __slots__ = ('channel', 'name', 'priority', 'started')
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.name = None
+        self.priority = 0
+        self.started = 0
+
+    def busy(self):
+        return self.name is not None and self.channel.get_busy()
+
+class SoundEffects:
+    """Fixed pool of mixer channels shared by every sound effect
+
+    The first `reserved` channels only ever play player sounds, each effect is
+    capped at its own number of voices, a full pool steals the oldest voice of a
+    lower priority, and effects too far from the camera are not played at all.
+    """
+    def __init__(self, effects=SOUND_EFFECTS, channels=16, reserved=2, hearing_distance=WIDTH * 0.75):
+        self.effects = effects
+        self.channels = channels
+        self.reserved = reserved
+        self.hearing_distance = hearing_distance
+        self.voices = []  # Created on first use, once the mixer is up
+        self.listener = None  # World position of the camera centre, None plays everything at full volume
+        self.plays = 0
+
+    def setup(self):
+        pygame.mixer.set_num_channels(self.channels)
+        pygame.mixer.set_reserved(self.reserved)
+        self.voices = [Voice(pygame.mixer.Channel(index)) for index in range(self.channels)]
+
+    def preload(self):
+        """Load every effect up front so the first play never touches the disk"""
+        if pygame.mixer.get_init():
+            for path, volume, max_voices, priority in self.effects.values():
+                assets.sound(path)
+
+    def play(self, name, pos=None):
+        """Play an effect emitted at world position pos (None for the player's own sounds)"""
+        if not pygame.mixer.get_init():
+            return None
+        if not self.voices:
+            self.setup()
+        path, volume, max_voices, priority = self.effects[name]
+        
+        # Cull effects out of earshot and fade the rest with distance
+        loudness = 1.0
+        if pos is not None and self.listener is not None:
+            distance = math.hypot(pos[0] - self.listener[0], pos[1] - self.listener[1])
+            if distance > self.hearing_distance:
+                return None
+            loudness = 1.0 - 0.5 * distance / self.hearing_distance
+        
+        sound = assets.sound(path)
+        if not sound:
+            return None
+        
+        # Respect the effect's voice cap and find a free (or stealable) channel
+        candidates = self.voices if priority >= PRIORITY_PLAYER else self.voices[self.reserved:]
+        free = None
+        victim = None
+        playing = 0
+        for voice in candidates:
+            if voice.busy():
+                if voice.name == name:
+                    playing += 1
+                if voice.priority < priority and (victim is None or (voice.priority, voice.started) < (victim.priority, victim.started)):
+                    victim = voice
+            elif free is None:
+                free = voice
+        if playing >= max_voices:
+            return None
+        voice = free or victim
+        if voice is None:
+            return None
+        
+        self.plays += 1
+        voice.name = name
+        voice.priority = priority
+        voice.started = self.plays
+        voice.channel.play(sound)
+        voice.channel.set_volume(volume * loudness)  # The effect's own volume lives on the channel, not the shared Sound
+        return voice.channel
+
+    def active_voices(self):
+        return sum(1 for voice in self.voices if voice.busy())
+
+# Shared by the player, every enemy and the boss
+sfx = SoundEffects()
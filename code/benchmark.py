@@ -0,0 +1,149 @@
+import sys
+import json
+import argparse
+
+from code.headless import HeadlessSimulation, wander_script
+from code.profiler import profiler, percentile
+
+# Phases reported for every scenario (collision and animation time is also part of update)
+PHASES = ['tick', 'update', 'pathfinding', 'collision', 'animation', 'draw', 'ui', 'spawn', 'hits']
+
+
+def setup_mob(simulation, goblins):
+    """Main map with a fixed goblin population"""
+    level = simulation.level
+    level.base_max_enemies = goblins
+    for _ in range(goblins):
+        level.spawn_goblin()
+
+
+def setup_boss(simulation, goblins):
+    """Boss arena with the boss spawned"""
+    level = simulation.level
+    level.arena = "Boss"
+    level.change_map('boss_field.tmx', (500, 500))
+    level.spawn_boss()
+
+
+# name -> (setup, keep goblins in the NumPy horde store)
+SCENARIOS = {
+    'mob': (setup_mob, False),
+    'boss': (setup_boss, False),
+    'horde': (setup_mob, True),
+}
+
+
+def run_scenario(name, goblins, ticks, warmup, seed, replay=None):
+    """Time one scenario; with a replay the recorded input (and its seed) drives the player instead of the script"""
+    setup, horde = SCENARIOS[name]
+    if replay:
+        simulation = HeadlessSimulation(render=True, horde=horde, replay=replay)
+    else:
+        simulation = HeadlessSimulation(script=wander_script, render=True, seed=seed, horde=horde)
+    setup(simulation, goblins)
+    player = simulation.level.player
+
+    profiler.reset(window=None)
+    profiler.enabled = False
+    for tick in range(warmup + ticks):
+        if tick == warmup:
+            profiler.enabled = True
+        # Keep the player alive so every run covers the same number of ticks
+        if player.health < player.max_health:
+            player.health = player.max_health
+            player.notify_stats_changed()
+        with profiler.section('tick'):
+            simulation.step()
+        profiler.end_tick()
+    profiler.enabled = False
+
+    report = {}
+    for phase in PHASES:
+        samples = list(profiler.history.get(phase, [0.0] * profiler.ticks))
+        report[phase] = {
+            'mean_ms': sum(samples) / len(samples) * 1000 if samples else 0.0,
+            'p50_ms': percentile(samples, 0.50) * 1000,
+            'p95_ms': percentile(samples, 0.95) * 1000,
+            'max_ms': max(samples, default=0.0) * 1000,
+        }
+    report['enemies'] = simulation.level.enemy_count()
+    report['counters'] = dict(profiler.counters)
+    return report
+
+
+def compare(results, baseline, tolerance, noise_floor_ms=0.05):
+    """Return a list of (scenario, phase, baseline p50, current p50) regressions"""
+    regressions = []
+    for name, phases in results['scenarios'].items():
+        base_phases = baseline.get('scenarios', {}).get(name)
+        if not base_phases:
+            continue
+        for phase in PHASES:
+            if phase not in phases or phase not in base_phases:
+                continue
+            current = phases[phase]['p50_ms']
+            previous = base_phases[phase]['p50_ms']
+            if current > previous * (1 + tolerance) and current - previous > noise_floor_ms:
+                regressions.append((name, phase, previous, current))
+    return regressions
+
+
+def print_report(results):
+    for name, phases in results['scenarios'].items():
+        print(f"\n[{name}] {phases['enemies']} enemies, {results['ticks']} ticks")
+        print(f"  {'phase':<10}{'mean':>9}{'p50':>9}{'p95':>9}{'max':>9}  (ms)")
+        for phase in PHASES:
+            stats = phases[phase]
+            print(f"  {phase:<10}{stats['mean_ms']:>9.3f}{stats['p50_ms']:>9.3f}{stats['p95_ms']:>9.3f}{stats['max_ms']:>9.3f}")
+        for counter, value in sorted(phases['counters'].items()):
+            print(f"  {counter}: {value:.3f}" if isinstance(value, float) else f"  {counter}: {value}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the game loop per subsystem')
+    parser.add_argument('--scenario', nargs='+', choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument('--goblins', type=int, default=50, help='goblins alive in the mob scenario')
+    parser.add_argument('--horde-goblins', type=int, default=1000, help='goblins alive in the horde scenario')
+    parser.add_argument('--ticks', type=int, default=600, help='measured ticks per scenario')
+    parser.add_argument('--warmup', type=int, default=60, help='unmeasured ticks before timing starts')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--replay', metavar='PATH', help='drive the player from an input recording instead of the wander script')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--baseline', help='compare p50 timings against a saved JSON result')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='allowed slowdown before a phase counts as a regression')
+    args = parser.parse_args(argv)
+
+    results = {
+        'ticks': args.ticks,
+        'warmup': args.warmup,
+        'goblins': args.goblins,
+        'horde_goblins': args.horde_goblins,
+        'seed': args.seed,
+        'replay': args.replay,
+        'scenarios': {},
+    }
+    for name in args.scenario:
+        goblins = args.horde_goblins if name == 'horde' else args.goblins
+        results['scenarios'][name] = run_scenario(name, goblins, args.ticks, args.warmup, args.seed, args.replay)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline (p50):")
+            for name, phase, previous, current in regressions:
+                print(f"  {name}/{phase}: {previous:.3f}ms -> {current:.3f}ms")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import pygame
+import os
+from code.settings import *
+from code.spatial import DynamicGrid
+
+class Hitbox:
+    """Attack area as a plain rect; never drawn, sorted or added to a sprite group"""
+    __slots__ = ('rect', 'owner')
+
+    def __init__(self):
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.owner = None
+
+class HitboxPool:
+    """Recycles Hitbox objects so attacks do not allocate every swing"""
+    def __init__(self):
+        self.free = []
+
+    def acquire(self, owner, size, center):
+        hitbox = self.free.pop() if self.free else Hitbox()
+        hitbox.owner = owner
+        hitbox.rect.size = size
+        hitbox.rect.center = center
+        return hitbox
+
+    def release(self, hitbox):
+        hitbox.owner = None
+        self.free.append(hitbox)
+
+class CombatSystem:
+    """Active attack hitboxes of one Level and the per-tick resolution of their hits"""
+    def __init__(self, cell_size=COLLISION_CELL_SIZE):
+        self.player_attack = None  # The player's attack hitbox while it is out
+        self.enemy_attacks = {}  # enemy -> attack hitbox, only for enemies mid-swing
+        self.spawn_order = {}  # enemy -> spawn sequence, so simultaneous hits resolve oldest first
+        self.next_order = 0
+        self.hurtboxes = DynamicGrid(cell_size)  # Enemy hitboxes, kept current by Entity.move
+        self.events = []  # (target, damage) queued during resolve()
+        self.pool = HitboxPool()
+        self.horde = None  # Array-backed goblins (horde mode), resolved in the same pass
+        self.debug = os.environ.get('PROJECT_M_DEBUG_HITBOXES', '') not in ('', '0')  # Outline hitboxes (F2)
+
+    def add_enemy(self, enemy):
+        self.spawn_order[enemy] = self.next_order
+        self.next_order += 1
+        self.hurtboxes.move(enemy, enemy.hitbox)
+        enemy.spatial_index = self.hurtboxes
+
+    def remove_enemy(self, enemy):
+        self.clear_enemy_attack(enemy)
+        self.spawn_order.pop(enemy, None)
+        self.hurtboxes.remove(enemy)
+        enemy.spatial_index = None
+
+    def spawn_enemy_attack(self, enemy):
+        """Put a 64x64 attack area on the side the enemy is facing"""
+        self.clear_enemy_attack(enemy)
+        x = enemy.rect.right if enemy.orientation == 'right' else enemy.rect.left
+        self.enemy_attacks[enemy] = self.pool.acquire(enemy, (64, 64), (x, enemy.rect.centery))
+
+    def clear_enemy_attack(self, enemy):
+        hitbox = self.enemy_attacks.pop(enemy, None)
+        if hitbox:
+            self.pool.release(hitbox)
+
+    def spawn_player_attack(self, player):
+        """Put a 96x96 attack area on the side the player is facing"""
+        self.clear_player_attack()
+        x = player.rect.right if player.orientation == 'right' else player.rect.left
+        self.player_attack = self.pool.acquire(player, (96, 96), (x, player.rect.centery - 10))
+
+    def clear_player_attack(self):
+        if self.player_attack:
+            self.pool.release(self.player_attack)
+            self.player_attack = None
+
+    def clear(self):
+        """Drop every hitbox and enemy (map change)"""
+        self.clear_player_attack()
+        for enemy in list(self.enemy_attacks):
+            self.clear_enemy_attack(enemy)
+        for enemy in list(self.spawn_order):
+            self.remove_enemy(enemy)
+
+    def resolve(self, player):
+        """Queue this tick's hits, apply them as one batch and return the enemies that died"""
+        events = self.events
+
+        # Player attack against the enemy hurtboxes near it
+        if self.player_attack:
+            attack_rect = self.player_attack.rect
+            for enemy in self.hurtboxes.query(attack_rect):
+                if attack_rect.colliderect(enemy.hitbox) and enemy.invincibility_timer <= 0:
+                    events.append((enemy, player.attack_power))
+
+        # Enemy attacks against the player (only enemies mid-swing have a hitbox)
+        attackers = [enemy for enemy, hitbox in self.enemy_attacks.items() if hitbox.rect.colliderect(player.hitbox)]
+        if attackers and player.invincibility_timer <= 0:
+            attackers.sort(key=lambda enemy: self.spawn_order.get(enemy, 0))
+            events.extend((player, enemy.attack_power) for enemy in attackers)
+
+        # Horde goblins are checked in bulk against the same two rects
+        if self.horde is not None and self.horde.count:
+            if self.player_attack:
+                self.horde.apply_hits(self.player_attack.rect, player.attack_power)
+            if player.invincibility_timer <= 0:
+                damage = self.horde.attack_hitting(player.hitbox)
+                if damage is not None:
+                    events.append((player, damage))
+
+        # Apply damage, then collect deaths in the same pass
+        dead = []
+        for target, damage in events:
+            target.take_damage(damage)
+            if target is not player and target.health <= 0 and target not in dead:
+                dead.append(target)
+        events.clear()
+
+        for enemy in dead:
+            self.remove_enemy(enemy)
+        return dead
+
+    def debug_draw(self, surface, offset):
+        """Outline hurtboxes and active attack areas in screen space"""
+        shift = (-int(offset.x), -int(offset.y))
+        for enemy in self.spawn_order:
+            pygame.draw.rect(surface, 'yellow', enemy.hitbox.move(shift), 1)
+        for hitbox in self.enemy_attacks.values():
+            pygame.draw.rect(surface, 'orange', hitbox.rect.move(shift), 2)
+        if self.player_attack:
+            pygame.draw.rect(surface, 'red', self.player_attack.rect.move(shift), 2)
+        if self.horde is not None:
+            self.horde.debug_draw(surface, offset)
@@ -1,78 +1,98 @@
 import pygame
+from code.settings import *
 from code.entity import Entity
+from code.animation import frame_atlas
+from code.assets import assets
+from code.profiler import profiler
+from code.audio import sfx
 import os
 
+def goblin_stats(player_level):
+    """Goblin (health, attack power, defense) scaled to the player's level"""
+    base_health = 500
+    base_attack_power = 15
+    base_defense = 2
+    level_multiplier = 1 + (player_level - 1) * 0.15  # 15% increase per level
+    return int(base_health * level_multiplier), int(base_attack_power * level_multiplier), int(base_defense * level_multiplier)
+
 class Goblin(Entity):
+    animations = None  # {animation: {orientation: frames}}, built once by load_animations()
+
+    @classmethod
+    def load_animations(cls):
+        """Slice the goblin sheet into the frame atlas on first use (shared with the horde store)"""
+        if cls.animations is not None:
+            return cls.animations
+        assets_path = os.path.join("assets", "Tiny Swords", "Tiny Swords (Update 010)", "Factions", "Goblins", "Troops", "Torch", "Purple")
+        sheet_path = os.path.join(assets_path, "Torch_Purple.png")
+        full_image = assets.image(sheet_path)
+        idle_image = full_image.subsurface((0, 0, full_image.get_width(), full_image.get_height()//5))
+        attack_image = full_image.subsurface((0, full_image.get_height()//5*2, full_image.get_width(), full_image.get_height()//5))
+        sheet_width, sheet_height = idle_image.get_size()
+        frame_width = sheet_width // 7
+        frame_height = sheet_height // 1
+        
+        frame_rects = [pygame.Rect(frame * frame_width, 0, frame_width, frame_height) for frame in range(7)]
+        cls.animations = {
+            'idle': frame_atlas.strip(sheet_path, 'idle', idle_image, frame_rects, (128, 128)),
+            'attack': frame_atlas.strip(sheet_path, 'attack', attack_image, frame_rects[:6], (128, 128)),
+        }
+        return cls.animations
+
     def __init__(self, pos, groups, obstacle_sprites, player, create_attack_hitbox, delete_attack_hitbox):
         super().__init__(groups)
         self.create_attack_hitbox = create_attack_hitbox
         self.delete_attack_hitbox = delete_attack_hitbox
-        assets_path = os.path.join("assets", "Tiny Swords", "Tiny Swords (Update 010)", "Factions", "Goblins", "Troops", "Torch", "Purple")
-        self.full_image = pygame.image.load(os.path.join(assets_path, "Torch_Purple.png")).convert_alpha()
-        self.idle_image = self.full_image.subsurface((0, 0, self.full_image.get_width(), self.full_image.get_height()//5))
-        self.attack_image = self.full_image.subsurface((0, self.full_image.get_height()//5*2, self.full_image.get_width(), self.full_image.get_height()//5))
-        self.sheet_width, self.sheet_height = self.idle_image.get_size()
-        self.frame_width = self.sheet_width // 7
-        self.frame_height = self.sheet_height // 1
-        
-        # Load sound effects
-        self.attack_sound = None
-        try:
-            audio_path = os.path.join("audio", "torch_slash.mp3")
-            if os.path.exists(audio_path):
-                self.attack_sound = pygame.mixer.Sound(audio_path)
-                self.attack_sound.set_volume(0.4)
-                print(f"Loaded torch_slash sound from {audio_path}")
-            else:
-                print(f"Sound file not found: {audio_path}")
-        except Exception as e:
-            print(f"Warning: Could not load torch_slash sound: {e}")
-
         self.current_frame = 0
         self.current_row = 0
-        temp_image = self.idle_image.subsurface(pygame.Rect(
-            (self.current_frame * self.frame_width),
-            (self.current_row * self.frame_height),
-            self.frame_width,
-            self.frame_height
-        ))
-        self.image = pygame.transform.scale(temp_image, (128, 128))
+
+        # Frames are sliced, scaled and flipped once and shared by every Goblin
+        self.load_animations()
+        self.image = self.animations['idle']['right'][self.current_frame]
         self.rect = self.image.get_rect(topleft=pos)
         self.hitbox = self.rect.inflate(-10, -30)
-        self.anim_interval = 0
+        self.anim_timer = 0
 
+        # Movement speeds in pixels per second
         self.direction = pygame.math.Vector2()
-        self.speed = 2
+        self.speed = 120
+        self.attack_slowdown = 60
         self.orientation = 'right'
 
         self.attack_anim = False
         self.attack_frame = 0
-        self.attack_cooldown = 0
+        self.attack_cooldown = 0  # seconds until the next attack
 
         self.obstacle_sprites = obstacle_sprites
         self.player = player
 
-        # Stats - will be scaled based on player level
-        self.base_health = 500
-        self.base_attack_power = 15
-        self.base_defense = 2
-        
-        # Scale stats based on player level
-        level_multiplier = 1 + (player.level - 1) * 0.15  # 15% increase per level
-        self.health = int(self.base_health * level_multiplier)
+        # Stats scaled to the player's level
+        self.health, self.attack_power, self.defense = goblin_stats(player.level)
         self.max_health = self.health
-        self.attack_power = int(self.base_attack_power * level_multiplier)
-        self.defense = int(self.base_defense * level_multiplier)
         
         self.detection_radius = 100
         self.attack_radius = 60
+        self.steering = None  # (dx, dy, chasing) set each tick by Level's batched steering pass
         
-        # Invincibility frames
+        # Invincibility time in seconds
         self.invincibility_timer = 0
-        self.invincibility_duration = 90
+        self.invincibility_duration = 1.5
 
     def ai_behavior(self):
         """AI logic to move towards player and attack when close"""
+        if self.steering is not None:
+            # Direction already computed for every goblin at once (code/steering.py)
+            dx, dy, chasing = self.steering
+            self.direction.update(dx, dy)
+            if chasing:
+                if dx > 0:
+                    self.orientation = 'right'
+                elif dx < 0:
+                    self.orientation = 'left'
+            elif self.attack_cooldown <= 0 and not self.attack_anim:
+                self.attack()
+            return
+        
         # Calculate distance to player
         player_vector = pygame.math.Vector2(self.player.rect.center) - pygame.math.Vector2(self.rect.center)
         distance = player_vector.length()
@@ -99,14 +119,13 @@ class Goblin(Entity):
 
     def attack(self):
         if not self.attack_anim:
-            self.speed -= 1
+            self.speed -= self.attack_slowdown
             self.attack_anim = True
             self.attack_frame = 4
             self.current_frame = 0
-            self.attack_cooldown = 15
-            # Play attack sound
-            if self.attack_sound:
-                self.attack_sound.play()
+            self.attack_cooldown = 2.7
+            # Play attack sound (culled when the goblin is far from the camera)
+            sfx.play('torch_slash', self.rect.center)
     
     def take_damage(self, damage):
         actual_damage = max(1, damage - self.defense)
@@ -115,14 +134,11 @@ class Goblin(Entity):
             self.health = 0
 
     def animate(self):
-        if self.attack_cooldown > 0:
-            self.attack_cooldown -= 1
-
         if self.attack_anim:
             self.attack_frame -= 1
             if self.attack_frame <= 0:
                 self.attack_anim = False
-                self.speed += 1
+                self.speed += self.attack_slowdown
                 self.delete_attack_hitbox(self)
             self.current_frame = (self.current_frame + 1) % 6
             self.update_sprite()
@@ -132,34 +148,14 @@ class Goblin(Entity):
 
     def update_sprite(self):
         if self.attack_anim:
-            src_rect = pygame.Rect(
-                self.current_frame * self.frame_width,
-                0,
-                self.frame_width,
-                self.frame_height
-            )
-            temp_image = self.attack_image.subsurface(src_rect)
-            temp_image = pygame.transform.scale(temp_image, (128, 128))
-            if self.orientation == 'left':
-                temp_image = pygame.transform.flip(temp_image, True, False)
-            self.image = temp_image
+            self.image = self.animations['attack'][self.orientation][self.current_frame]
             if self.current_frame == 2:
                 self.create_attack_hitbox(self)
             else:
                 self.delete_attack_hitbox(self)
         else:
             self.delete_attack_hitbox(self)
-            src_rect = pygame.Rect(
-                self.current_frame * self.frame_width,
-                0,
-                self.frame_width,
-                self.frame_height
-            )
-            temp_image = self.idle_image.subsurface(src_rect)
-            temp_image = pygame.transform.scale(temp_image, (128, 128))
-            if self.orientation == 'left':
-                temp_image = pygame.transform.flip(temp_image, True, False)
-            self.image = temp_image
+            self.image = self.animations['idle'][self.orientation][self.current_frame]
 
     def draw_health_bar(self, surface, camera_offset):
         """Draw health bar below the enemy"""
@@ -196,59 +192,79 @@ class Goblin(Entity):
         # Draw border
         pygame.draw.rect(surface, (20, 20, 20), background_rect, border_width)
 
-    def update(self, boundary_rect):
+    def update(self, boundary_rect, dt, animate=True):
         self.ai_behavior()
-        self.move(boundary_rect)
-        if self.anim_interval < 1:
-            self.anim_interval += 0.1
-        if self.anim_interval >= 1:
-            self.anim_interval = 0
-            self.animate()
+        self.move(boundary_rect, dt)
+        # Off-screen enemies (animate=False) hold their idle frame; attacks still play out
+        if animate or self.attack_anim:
+            self.anim_timer += dt
+            if self.anim_timer >= ANIMATION_FRAME_TIME:
+                self.anim_timer -= ANIMATION_FRAME_TIME
+                with profiler.section('animation'):
+                    self.animate()
         
-        # Update invincibility timer
+        # Update attack cooldown and invincibility timers
+        if self.attack_cooldown > 0:
+            self.attack_cooldown -= dt
         if self.invincibility_timer > 0:
-            self.invincibility_timer -= 1
+            self.invincibility_timer -= dt
 
 
 class Boss(Entity):
     """Boss enemy with high health and damage"""
-    def __init__(self, pos, groups, obstacle_sprites, player, create_attack_hitbox, delete_attack_hitbox):
-        super().__init__(groups)
-        self.create_attack_hitbox = create_attack_hitbox
-        self.delete_attack_hitbox = delete_attack_hitbox
-        assets_path = os.path.join("assets", "Tiny Swords", "Tiny Swords (Update 010)", "Factions", "Knights", "Troops", "Warrior", "Red")
-        self.full_image = pygame.image.load(os.path.join(assets_path, "Warrior_Red.png")).convert_alpha()
-        self.idle_image = self.full_image.subsurface((0, 0, self.full_image.get_width(), self.full_image.get_height()//8))
+    sheet_path = os.path.join("assets", "Tiny Swords", "Tiny Swords (Update 010)", "Factions", "Knights", "Troops", "Warrior", "Red", "Warrior_Red.png")
+    animations = None  # {animation: {orientation: frames}}, built once by load_animations()
+
+    @classmethod
+    def load_animations(cls):
+        """Slice the boss sheet into the frame atlas on first use"""
+        if cls.animations is not None:
+            return cls.animations
+        sheet_path = cls.sheet_path
+        full_image = assets.image(sheet_path)
+        idle_image = full_image.subsurface((0, 0, full_image.get_width(), full_image.get_height()//8))
         # Attack images - each should have 3 frames
-        attack_width = self.full_image.get_width() // 2
-        self.attack_image1 = self.full_image.subsurface((attack_width, self.full_image.get_height()//8*2, attack_width, self.full_image.get_height()//8))
-        self.attack_image2 = self.full_image.subsurface((attack_width, self.full_image.get_height()//8*3, attack_width, self.full_image.get_height()//8))
-        self.sheet_width, self.sheet_height = self.idle_image.get_size()
-        self.frame_width = self.sheet_width // 6
-        self.frame_height = self.sheet_height // 1
+        attack_width = full_image.get_width() // 2
+        attack_image1 = full_image.subsurface((attack_width, full_image.get_height()//8*2, attack_width, full_image.get_height()//8))
+        attack_image2 = full_image.subsurface((attack_width, full_image.get_height()//8*3, attack_width, full_image.get_height()//8))
+        sheet_width, sheet_height = idle_image.get_size()
+        frame_width = sheet_width // 6
+        frame_height = sheet_height // 1
         
         # Attack frame width (3 frames per attack animation)
-        self.attack_frame_width = attack_width // 3
+        attack_frame_width = attack_width // 3
         
+        attack_rects = [pygame.Rect(frame * attack_frame_width, 0, attack_frame_width, frame_height) for frame in range(3)]
+        cls.animations = {
+            'idle': frame_atlas.strip(sheet_path, 'idle', idle_image,
+                                      [pygame.Rect(frame * frame_width, 0, frame_width, frame_height) for frame in range(6)], (256, 256)),
+            'attack1': frame_atlas.strip(sheet_path, 'attack1', attack_image1, attack_rects, (256, 256)),
+            'attack2': frame_atlas.strip(sheet_path, 'attack2', attack_image2, attack_rects, (256, 256)),
+        }
+        return cls.animations
+
+    def __init__(self, pos, groups, obstacle_sprites, player, create_attack_hitbox, delete_attack_hitbox):
+        super().__init__(groups)
+        self.create_attack_hitbox = create_attack_hitbox
+        self.delete_attack_hitbox = delete_attack_hitbox
         self.current_frame = 0
-        temp_image = self.idle_image.subsurface(pygame.Rect(
-            (self.current_frame * self.frame_width),
-            (0),
-            self.frame_width,
-            self.frame_height
-        ))
-        self.image = pygame.transform.scale(temp_image, (256, 256))
+
+        # Frames are sliced, scaled and flipped once and shared by every Boss
+        self.load_animations()
+        self.image = self.animations['idle']['right'][self.current_frame]
         self.rect = self.image.get_rect(topleft=pos)
         self.hitbox = self.rect.inflate(-20, -60)
-        self.anim_interval = 0
+        self.anim_timer = 0
 
+        # Movement speeds in pixels per second
         self.direction = pygame.math.Vector2()
-        self.speed = 1
+        self.speed = 60
+        self.attack_slowdown = 30
         self.orientation = 'right'
 
         self.attack_anim = False
         self.attack_frame = 0
-        self.attack_cooldown = 0
+        self.attack_cooldown = 0  # seconds until the next attack
 
         self.obstacle_sprites = obstacle_sprites
         self.player = player
@@ -260,10 +276,11 @@ class Boss(Entity):
         self.defense = 5
         self.detection_radius = 300
         self.attack_radius = 80
+        self.flow_field = None  # FlowField toward the player, set by Level each tick when NumPy is available
         
-        # Invincibility frames
+        # Invincibility time in seconds
         self.invincibility_timer = 0
-        self.invincibility_duration = 120
+        self.invincibility_duration = 2.0
         
         # Attack animation phase tracking
         self.attack_phase = 0  # 0 = image1, 1 = image2, 2 = image1 again
@@ -281,8 +298,12 @@ class Boss(Entity):
         # Always chase player (no detection radius limit)
         if distance > 0:
             if distance > self.attack_radius:
-                # Move towards player
+                # Move towards player, routed around obstacles when there is no clear line
                 self.direction = player_vector.normalize()
+                if self.flow_field is not None:
+                    dx, dy = self.flow_field.sample(*self.hitbox.center)
+                    if dx or dy:
+                        self.direction.update(dx, dy)
                 
                 # Update orientation based on movement
                 if self.direction.x > 0:
@@ -296,12 +317,13 @@ class Boss(Entity):
 
     def attack(self):
         if not self.attack_anim:
-            self.speed -= 0.5
+            self.speed -= self.attack_slowdown
             self.attack_anim = True
             self.attack_frame = 9  # 9 frames total (3 frames x 3 phases)
             self.current_frame = 0
-            self.attack_cooldown = 30
+            self.attack_cooldown = 5.4
             self.attack_phase = 0  # Start with attack_image1
+            sfx.play('boss_slash', self.rect.center)
     
     def take_damage(self, damage):
         actual_damage = max(1, damage - self.defense)
@@ -310,9 +332,6 @@ class Boss(Entity):
             self.health = 0
 
     def animate(self):
-        if self.attack_cooldown > 0:
-            self.attack_cooldown -= 1
-
         if self.attack_anim:
             self.attack_frame -= 1
             
@@ -329,7 +348,7 @@ class Boss(Entity):
             
             if self.attack_frame <= 0:
                 self.attack_anim = False
-                self.speed += 0.5
+                self.speed += self.attack_slowdown
                 self.delete_attack_hitbox(self)
                 self.attack_phase = 0
             
@@ -341,25 +360,15 @@ class Boss(Entity):
 
     def update_sprite(self):
         if self.attack_anim:
-            # Choose the correct attack image based on phase
+            # Choose the correct attack animation based on phase
             if self.attack_phase == 0:
-                current_attack_image = self.attack_image1
+                current_attack = 'attack1'
             elif self.attack_phase == 1:
-                current_attack_image = self.attack_image2
+                current_attack = 'attack2'
             else:  # phase 2
-                current_attack_image = self.attack_image1
+                current_attack = 'attack1'
             
-            src_rect = pygame.Rect(
-                self.current_frame * self.attack_frame_width,
-                0,
-                self.attack_frame_width,
-                self.frame_height
-            )
-            temp_image = current_attack_image.subsurface(src_rect)
-            temp_image = pygame.transform.scale(temp_image, (256, 256))
-            if self.orientation == 'left':
-                temp_image = pygame.transform.flip(temp_image, True, False)
-            self.image = temp_image
+            self.image = self.animations[current_attack][self.orientation][self.current_frame]
             # Only create hitbox on second to last frame (frame 1 out of 0,1,2)
             if self.current_frame == 1:
                 self.create_attack_hitbox(self)
@@ -367,27 +376,21 @@ class Boss(Entity):
                 self.delete_attack_hitbox(self)
         else:
             self.delete_attack_hitbox(self)
-            src_rect = pygame.Rect(
-                self.current_frame * self.frame_width,
-                0,
-                self.frame_width,
-                self.frame_height
-            )
-            temp_image = self.idle_image.subsurface(src_rect)
-            temp_image = pygame.transform.scale(temp_image, (256, 256))
-            if self.orientation == 'left':
-                temp_image = pygame.transform.flip(temp_image, True, False)
-            self.image = temp_image
-
-    def update(self, boundary_rect):
+            self.image = self.animations['idle'][self.orientation][self.current_frame]
+
+    def update(self, boundary_rect, dt, animate=True):
         self.ai_behavior()
-        self.move(boundary_rect)
-        if self.anim_interval < 1:
-            self.anim_interval += 0.1
-        if self.anim_interval >= 1:
-            self.anim_interval = 0
-            self.animate()
+        self.move(boundary_rect, dt)
+        # Off-screen enemies (animate=False) hold their idle frame; attacks still play out
+        if animate or self.attack_anim:
+            self.anim_timer += dt
+            if self.anim_timer >= ANIMATION_FRAME_TIME:
+                self.anim_timer -= ANIMATION_FRAME_TIME
+                with profiler.section('animation'):
+                    self.animate()
         
-        # Update invincibility timer
+        # Update attack cooldown and invincibility timers
+        if self.attack_cooldown > 0:
+            self.attack_cooldown -= dt
         if self.invincibility_timer > 0:
-            self.invincibility_timer -= 1
\ No newline at end of file
+            self.invincibility_timer -= dt
\ No newline at end of file
@@ -1,39 +1,50 @@
 import pygame
+from code.profiler import profiler
 
 class Entity(pygame.sprite.Sprite):
     def __init__(self, groups):
         super().__init__(groups)
         self.invincible = False
         self.invincibility_duration = 10
+        self.spatial_index = None  # Moving-entity grid (e.g. combat hurtboxes) kept up to date by move()
 		
-    def move(self, boundary_rect):
+    def move(self, boundary_rect, dt):
         if self.direction.length_squared() > 0:
             if self.direction.length() != 0:
                 self.direction = self.direction.normalize()
 
-            new_x = self.hitbox.x + self.direction.x * self.speed
-            new_y = self.hitbox.y + self.direction.y * self.speed
+            new_x = self.hitbox.x + self.direction.x * self.speed * dt
+            new_y = self.hitbox.y + self.direction.y * self.speed * dt
 
             # Keep player within map boundaries
             new_x = max(boundary_rect.left, min(new_x, boundary_rect.right - self.hitbox.width))
             new_y = max(boundary_rect.top, min(new_y, boundary_rect.bottom - self.hitbox.height))
 
-            self.hitbox.x = new_x
-            self.collide('horizontal')
-            self.hitbox.y = new_y
-            self.collide('vertical')
+            with profiler.section('collision'):
+                # Only test obstacles near the area swept by this move
+                target = pygame.Rect(new_x, new_y, self.hitbox.width, self.hitbox.height)
+                nearby = self.obstacle_sprites.near(self.hitbox.union(target))
+
+                self.hitbox.x = new_x
+                self.collide('horizontal', nearby)
+                self.hitbox.y = new_y
+                self.collide('vertical', nearby)
             self.rect.center = self.hitbox.center
+            if self.spatial_index is not None:
+                self.spatial_index.move(self, self.hitbox)
 
-    def collide(self, direction):
+    def collide(self, direction, obstacles=None):
+        if obstacles is None:
+            obstacles = self.obstacle_sprites
         if direction == 'horizontal':
-            for sprite in self.obstacle_sprites:
+            for sprite in obstacles:
                 if sprite.rect.colliderect(self.hitbox):
                     if self.direction.x > 0: # moving right
                         self.hitbox.right = sprite.rect.left
                     if self.direction.x < 0: # moving left
                         self.hitbox.left = sprite.rect.right
         if direction == 'vertical':
-            for sprite in self.obstacle_sprites:
+            for sprite in obstacles:
                 if sprite.rect.colliderect(self.hitbox):
                     if self.direction.y > 0: # moving down
                         self.hitbox.bottom = sprite.rect.top
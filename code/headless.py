@@ -0,0 +1,119 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+# The dummy drivers must be selected before pygame initialises SDL
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from code.settings import *
+from code.audio import music
+
+
+def init_headless():
+    """Initialise pygame against an offscreen display and return its surface"""
+    pygame.init()
+    try:
+        pygame.mixer.init()
+    except pygame.error as e:
+        print(f"Warning: Audio disabled in headless mode: {e}")
+    return pygame.display.set_mode((WIDTH, HEIGHT))
+
+
+def wander_script(tick):
+    """Walk a square around the spawn point, attacking and dodging periodically"""
+    route = [pygame.K_d, pygame.K_s, pygame.K_a, pygame.K_w]
+    return {
+        'keys': {route[(tick // 120) % len(route)]},
+        'attack': tick % 45 == 0,
+        'dodge': tick % 300 == 150,
+    }
+
+
+class HeadlessSimulation:
+    """Steps a Level as fast as possible with scripted or replayed input and no real display
+
+    A replay brings its own seed and horde setting unless they are given here.
+    """
+    def __init__(self, script=None, render=False, seed=None, horde=None, replay=None):
+        # Deferred so the dummy drivers are in place before any surface is created
+        from code.level import Level
+        from code.input import InputSystem, ScriptedInput, Replay
+
+        if replay is not None:
+            source = Replay(replay)
+            seed = source.seed if seed is None else seed
+            horde = source.horde if horde is None else horde
+        else:
+            source = ScriptedInput(script or wander_script)
+        if seed is not None:
+            random.seed(seed)
+        self.seed = seed
+        self.screen = init_headless()
+        self.render = render
+        self.replay = source if replay is not None else None
+        self.level = Level(render=render, horde=horde, controls=InputSystem(source))
+        self.tick = 0
+
+    def step(self):
+        """Advance the simulation by one fixed tick"""
+        pygame.event.pump()
+        music.update()  # Track changes progress as they do in Game.run
+        if self.render:
+            self.screen.fill('black')
+        result = self.level.run()
+        self.tick += 1
+        return result
+
+    def run(self, ticks):
+        """Step up to `ticks` times and report throughput"""
+        start = time.perf_counter()
+        game_over = False
+        for _ in range(ticks):
+            result = self.step()
+            if result and result.get('game_over'):
+                game_over = True
+                break
+        elapsed = time.perf_counter() - start
+        return {
+            'ticks': self.tick,
+            'seconds': elapsed,
+            'ticks_per_second': self.tick / elapsed if elapsed > 0 else 0.0,
+            'game_over': game_over,
+            'enemies': self.level.enemy_count(),
+            'player_level': self.level.player.level,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the game simulation without a display')
+    parser.add_argument('--ticks', type=int, help='number of simulation ticks to run (default 3600, or the whole replay)')
+    parser.add_argument('--render', action='store_true', help='draw every tick to an offscreen surface')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for enemy spawns')
+    parser.add_argument('--horde', action='store_true', help='keep goblins in the NumPy horde store')
+    parser.add_argument('--record', metavar='PATH', help='write the input of every tick to an input recording')
+    parser.add_argument('--replay', metavar='PATH', help='play back an input recording (with its seed) instead of the script')
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        simulation = HeadlessSimulation(render=args.render, horde=args.horde or None, replay=args.replay)
+        ticks = args.ticks if args.ticks is not None else len(simulation.replay.ticks)
+    else:
+        simulation = HeadlessSimulation(render=args.render, seed=args.seed, horde=args.horde or None)
+        ticks = args.ticks if args.ticks is not None else 3600
+    if args.record:
+        simulation.level.input.start_recording(args.record, simulation.seed or 0, simulation.level.horde is not None)
+    stats = simulation.run(ticks)
+    simulation.level.input.stop_recording()
+    print(f"Ran {stats['ticks']} ticks in {stats['seconds']:.2f}s ({stats['ticks_per_second']:.0f} ticks/s), "
+          f"{stats['enemies']} enemies alive, player level {stats['player_level']}"
+          + (", game over" if stats['game_over'] else ""))
+    pygame.quit()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
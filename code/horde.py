@@ -0,0 +1,277 @@
+import pygame
+import numpy as np  # Only needed for horde mode; Level falls back to Goblin sprites without it
+from code.settings import *
+from code.enemy import Goblin
+from code.audio import sfx
+from code.steering import steer
+from entity import Entity as EnemyRecord
+
+# Goblin geometry and tuning, matching the Goblin sprite class
+SPRITE_SIZE = 128
+HITBOX_SIZE = (118, 98)  # Goblin rect.inflate(-10, -30)
+HITBOX_OFFSET = (5, 15)  # Hitbox topleft relative to the sprite rect
+ATTACK_SIZE = 64
+SPEED = 120
+ATTACK_SLOWDOWN = 60
+ATTACK_RADIUS = 60
+ATTACK_COOLDOWN = 2.7
+ATTACK_FRAMES = 4
+
+# name -> (per-row shape, dtype) of every column in the store
+FIELDS = {
+    'ids': ((), 'i8'),
+    'pos': ((2,), 'f8'),  # Hitbox topleft
+    'previous': ((2,), 'f8'),  # Hitbox topleft before the current tick (render interpolation)
+    'velocity': ((2,), 'f8'),
+    'health': ((), 'f8'),
+    'max_health': ((), 'f8'),
+    'damage': ((), 'f8'),
+    'defense': ((), 'f8'),
+    'speed': ((), 'f8'),
+    'cooldown': ((), 'f8'),
+    'invincibility': ((), 'f8'),
+    'anim_timer': ((), 'f8'),
+    'anim_frame': ((), 'i2'),
+    'attack_frame': ((), 'i2'),
+    'attacking': ((), '?'),
+    'facing': ((), 'i1'),  # 1 faces right, -1 faces left
+}
+
+class HordeSprite(pygame.sprite.Sprite):
+    """Short-lived view of one on-screen horde goblin, only used for drawing"""
+    def __init__(self):
+        super().__init__()
+        self.image = None
+        self.rect = pygame.Rect(0, 0, SPRITE_SIZE, SPRITE_SIZE)
+        self.previous_topleft = None
+        self.health = 0
+        self.max_health = 1
+
+    # Same bar as sprite goblins
+    draw_health_bar = Goblin.draw_health_bar
+
+class HordeStore:
+    """Goblins stored as structure-of-arrays rows and updated in vectorized form (needs NumPy)
+
+    Live goblins are packed into rows 0..count-1 in spawn order. Each row
+    carries the plain data of a root `entity.Entity` (id, position, health,
+    damage) plus the velocity, timers and animation state a Goblin keeps.
+    """
+    body_size = HITBOX_SIZE  # Every horde goblin shares one flow field
+    
+    def __init__(self, capacity=256):
+        self.count = 0
+        self.next_id = 0
+        self.capacity = 0
+        for name, (shape, dtype) in FIELDS.items():
+            setattr(self, name, np.zeros((capacity,) + shape, dtype=dtype))
+        self.capacity = capacity
+        self.nav = None  # NavGrid of the current map
+        self.flow = None  # FlowField toward the player for the goblin body size
+        self.animations = Goblin.load_animations()  # The same frames dict every Goblin reads
+        self.pool = []  # HordeSprites reused every frame for on-screen goblins
+        self.half_hitbox = np.array(HITBOX_SIZE, dtype='f8') / 2
+
+    def grow(self):
+        capacity = self.capacity * 2
+        for name, (shape, dtype) in FIELDS.items():
+            column = np.zeros((capacity,) + shape, dtype=dtype)
+            column[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, column)
+        self.capacity = capacity
+
+    def spawn(self, record, defense):
+        """Add a goblin from a plain entity record; position is its sprite topleft"""
+        if self.count == self.capacity:
+            self.grow()
+        row = self.count
+        self.count += 1
+        record.entity_id = self.next_id
+        self.next_id += 1
+        self.ids[row] = record.entity_id
+        self.pos[row] = (record.position[0] + HITBOX_OFFSET[0], record.position[1] + HITBOX_OFFSET[1])
+        self.previous[row] = self.pos[row]
+        self.velocity[row] = 0
+        self.health[row] = record.health
+        self.max_health[row] = record.health
+        self.damage[row] = record.damage
+        self.defense[row] = defense
+        self.speed[row] = SPEED
+        self.cooldown[row] = 0
+        self.invincibility[row] = 0
+        self.anim_timer[row] = 0
+        self.anim_frame[row] = 0
+        self.attack_frame[row] = 0
+        self.attacking[row] = False
+        self.facing[row] = 1
+        return record
+
+    def record(self, row):
+        """Plain entity snapshot of a row"""
+        record = EnemyRecord(int(self.ids[row]), (float(self.pos[row, 0] - HITBOX_OFFSET[0]), float(self.pos[row, 1] - HITBOX_OFFSET[1])))
+        record.health = float(self.health[row])
+        record.damage = float(self.damage[row])
+        return record
+
+    def clear(self):
+        self.count = 0
+
+    def store_previous_positions(self):
+        self.previous[:self.count] = self.pos[:self.count]
+
+    def update(self, player, boundary_rect, dt):
+        """Chase, attack, move, animate and tick timers for every goblin at once"""
+        n = self.count
+        if not n:
+            return
+        pos = self.pos[:n]
+        speed = self.speed[:n]
+        attacking = self.attacking[:n]
+        cooldown = self.cooldown[:n]
+
+        # Chase the player along the flow field until within attack range, keeping apart and around obstacles
+        centers = pos + self.half_hitbox
+        direction, chasing, distance = steer(centers, player.rect.center, HITBOX_SIZE, ATTACK_RADIUS, self.nav, self.flow)
+        facing = self.facing[:n]
+        facing[chasing & (direction[:, 0] > 0)] = 1
+        facing[chasing & (direction[:, 0] < 0)] = -1
+
+        starting = ~chasing & (distance > 0) & (cooldown <= 0) & ~attacking
+        if starting.any():
+            speed[starting] -= ATTACK_SLOWDOWN
+            attacking[starting] = True
+            self.attack_frame[:n][starting] = ATTACK_FRAMES
+            self.anim_frame[:n][starting] = 0
+            cooldown[starting] = ATTACK_COOLDOWN
+            for row in np.flatnonzero(starting):
+                sfx.play('torch_slash', (centers[row, 0], centers[row, 1]))
+
+        self.move(direction, boundary_rect, dt)
+        self.animate(dt)
+
+        # Attack cooldown and invincibility timers
+        cooldown[cooldown > 0] -= dt
+        invincibility = self.invincibility[:n]
+        invincibility[invincibility > 0] -= dt
+
+    def move(self, direction, boundary_rect, dt):
+        n = self.count
+        pos = self.pos[:n]
+        velocity = self.velocity[:n]
+        np.multiply(direction, self.speed[:n, None], out=velocity)
+        width, height = HITBOX_SIZE
+        new_x = np.clip(pos[:, 0] + velocity[:, 0] * dt, boundary_rect.left, boundary_rect.right - width)
+        new_y = np.clip(pos[:, 1] + velocity[:, 1] * dt, boundary_rect.top, boundary_rect.bottom - height)
+
+        # Per-axis tile collision; goblins already overlapping a blocked tile may walk out of it
+        if self.nav is not None:
+            stuck = self.nav.boxes_blocked(pos[:, 0], pos[:, 1], width, height)
+            blocked = self.nav.boxes_blocked(new_x, pos[:, 1], width, height) & ~stuck
+            new_x[blocked] = pos[blocked, 0]
+            blocked = self.nav.boxes_blocked(new_x, new_y, width, height) & ~stuck
+            new_y[blocked] = pos[blocked, 1]
+        pos[:, 0] = new_x
+        pos[:, 1] = new_y
+
+    def animate(self, dt):
+        """Advance animation frames and attack state (Goblin.animate) for rows due a frame"""
+        n = self.count
+        anim_timer = self.anim_timer[:n]
+        anim_timer += dt
+        stepping = anim_timer >= ANIMATION_FRAME_TIME
+        if not stepping.any():
+            return
+        anim_timer[stepping] -= ANIMATION_FRAME_TIME
+        attacking = self.attacking[:n]
+        anim_frame = self.anim_frame[:n]
+
+        swinging = stepping & attacking
+        idle = stepping & ~attacking
+        attack_frame = self.attack_frame[:n]
+        attack_frame[swinging] -= 1
+        finished = swinging & (attack_frame <= 0)
+        attacking[finished] = False
+        self.speed[:n][finished] += ATTACK_SLOWDOWN
+        anim_frame[swinging] = (anim_frame[swinging] + 1) % 6
+        anim_frame[idle] = (anim_frame[idle] + 1) % 7
+
+    def attack_rects(self):
+        """Rows whose swing is on its hitting frame, and the (left, top) of their attack areas"""
+        n = self.count
+        active = np.flatnonzero(self.attacking[:n] & (self.anim_frame[:n] == 2))
+        centers = self.pos[active] + self.half_hitbox
+        lefts = centers[:, 0] + self.facing[active] * (SPRITE_SIZE // 2) - ATTACK_SIZE // 2
+        tops = centers[:, 1] - ATTACK_SIZE // 2
+        return active, lefts, tops
+
+    def attack_hitting(self, rect):
+        """Damage of the oldest goblin whose attack area overlaps rect, or None"""
+        if not self.count:
+            return None
+        active, lefts, tops = self.attack_rects()
+        hits = (lefts < rect.right) & (lefts + ATTACK_SIZE > rect.left) & (tops < rect.bottom) & (tops + ATTACK_SIZE > rect.top)
+        if not hits.any():
+            return None
+        rows = active[hits]
+        return float(self.damage[rows[np.argmin(self.ids[rows])]])
+
+    def apply_hits(self, rect, power):
+        """Damage every goblin whose hitbox overlaps rect"""
+        n = self.count
+        pos = self.pos[:n]
+        width, height = HITBOX_SIZE
+        hit = ((pos[:, 0] < rect.right) & (pos[:, 0] + width > rect.left)
+               & (pos[:, 1] < rect.bottom) & (pos[:, 1] + height > rect.top)
+               & (self.invincibility[:n] <= 0))
+        if hit.any():
+            health = self.health[:n]
+            health[hit] -= np.maximum(1, power - self.defense[:n][hit])
+            np.maximum(health, 0, out=health)
+
+    def remove_dead(self):
+        """Drop dead rows (keeping spawn order) and return their entity records"""
+        n = self.count
+        dead = self.health[:n] <= 0
+        if not dead.any():
+            return []
+        records = [self.record(row) for row in np.flatnonzero(dead)]
+        alive = ~dead
+        remaining = int(alive.sum())
+        for name in FIELDS:
+            column = getattr(self, name)
+            column[:remaining] = column[:n][alive]
+        self.count = remaining
+        return records
+
+    def sprites_in_view(self, view):
+        """Materialize pooled sprites for the goblins overlapping the camera view"""
+        n = self.count
+        if not n:
+            return []
+        tops_left = self.pos[:n] - HITBOX_OFFSET
+        lefts = tops_left[:, 0].astype(int)
+        tops = tops_left[:, 1].astype(int)
+        visible = np.flatnonzero((lefts < view.right) & (lefts + SPRITE_SIZE > view.left)
+                                 & (tops < view.bottom) & (tops + SPRITE_SIZE > view.top))
+        while len(self.pool) < len(visible):
+            self.pool.append(HordeSprite())
+
+        sprites = []
+        for sprite, row in zip(self.pool, visible):
+            orientation = 'right' if self.facing[row] > 0 else 'left'
+            animation = 'attack' if self.attacking[row] else 'idle'
+            sprite.image = self.animations[animation][orientation][self.anim_frame[row]]
+            sprite.rect.topleft = (lefts[row], tops[row])
+            sprite.previous_topleft = (int(self.previous[row, 0] - HITBOX_OFFSET[0]), int(self.previous[row, 1] - HITBOX_OFFSET[1]))
+            sprite.health = self.health[row]
+            sprite.max_health = self.max_health[row]
+            sprites.append(sprite)
+        return sprites
+
+    def debug_draw(self, surface, offset):
+        shift = np.array((offset.x, offset.y))
+        for left, top in self.pos[:self.count] - shift:
+            pygame.draw.rect(surface, 'yellow', (int(left), int(top), *HITBOX_SIZE), 1)
+        active, lefts, tops = self.attack_rects()
+        for left, top in zip(lefts - shift[0], tops - shift[1]):
+            pygame.draw.rect(surface, 'orange', (int(left), int(top), ATTACK_SIZE, ATTACK_SIZE), 2)
@@ -0,0 +1,164 @@
+import pygame
+import struct
+from code.settings import *
+
+# Every action the game reads, in bitmask order (at most 8, one byte per mask in recordings)
+ACTIONS = ('up', 'down', 'left', 'right', 'attack', 'dodge', 'interact')
+ACTION_BITS = {name: 1 << index for index, name in enumerate(ACTIONS)}
+
+KEY_BINDINGS = {
+    pygame.K_UP: 'up', pygame.K_w: 'up',
+    pygame.K_DOWN: 'down', pygame.K_s: 'down',
+    pygame.K_LEFT: 'left', pygame.K_a: 'left',
+    pygame.K_RIGHT: 'right', pygame.K_d: 'right',
+    pygame.K_e: 'interact',
+}
+MOUSE_BINDINGS = {1: 'attack', 3: 'dodge'}  # mouse button -> action
+
+# Recording layout: header, then one (held, taps) byte pair per tick
+RECORDING_MAGIC = b'PMIR'
+RECORDING_VERSION = 2  # Version 1 also counted a held bit appearing as a press
+RECORDING_HEADER = struct.Struct('<4sBqB')  # magic, version, random seed, flags
+RECORDING_TICK = struct.Struct('<BB')
+FLAG_HORDE = 1
+
+def keys_mask(keys):
+    """Bitmask of the actions bound to the keys held in a pygame.key.get_pressed() result"""
+    mask = 0
+    for key, action in KEY_BINDINGS.items():
+        if keys[key]:
+            mask |= ACTION_BITS[action]
+    return mask
+
+def mouse_mask(buttons):
+    """Bitmask of the actions bound to the buttons held in a pygame.mouse.get_pressed() result"""
+    mask = 0
+    for button, action in MOUSE_BINDINGS.items():
+        if buttons[button - 1]:
+            mask |= ACTION_BITS[action]
+    return mask
+
+class ActionState:
+    """The actions of one tick: held now, pressed since the last tick, released since the last tick"""
+    __slots__ = ('held_mask', 'pressed_mask', 'released_mask')
+
+    def __init__(self, held_mask=0, pressed_mask=0, released_mask=0):
+        self.held_mask = held_mask
+        self.pressed_mask = pressed_mask
+        self.released_mask = released_mask
+
+    def held(self, action):
+        return bool(self.held_mask & ACTION_BITS[action])
+
+    def pressed(self, action):
+        return bool(self.pressed_mask & ACTION_BITS[action])
+
+    def released(self, action):
+        return bool(self.released_mask & ACTION_BITS[action])
+
+class KeyboardMouse:
+    """Live input: held keys and buttons are read once per tick, presses between ticks are latched from events
+
+    A click or key tap that starts and ends between two ticks still counts
+    as a press on the next tick. Held state always comes from pygame's
+    current key and button state, so a release the game never saw as an
+    event (e.g. while a menu was open) cannot leave an action stuck. Presses
+    only come from events the game loop received, so the click that closes
+    a menu is not pressed again on the first tick after it.
+    """
+    def __init__(self):
+        self.taps = 0  # Actions pressed since the last read
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key in KEY_BINDINGS:
+            self.taps |= ACTION_BITS[KEY_BINDINGS[event.key]]
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button in MOUSE_BINDINGS:
+            self.taps |= ACTION_BITS[MOUSE_BINDINGS[event.button]]
+
+    def read(self):
+        """(held, taps) bitmasks for the next tick"""
+        taps, self.taps = self.taps, 0
+        return keys_mask(pygame.key.get_pressed()) | mouse_mask(pygame.mouse.get_pressed()), taps
+
+class ScriptedInput:
+    """Input from a function of the tick number returning {'keys': held keys, 'attack': bool, 'dodge': bool}"""
+    def __init__(self, script):
+        self.script = script
+        self.tick = 0
+        self.previous = 0  # Held mask of the last tick; keys the script starts holding count as taps
+
+    def read(self):
+        actions = self.script(self.tick) or {}
+        self.tick += 1
+        held = 0
+        for key in actions.get('keys', ()):
+            if key in KEY_BINDINGS:
+                held |= ACTION_BITS[KEY_BINDINGS[key]]
+        taps = held & ~self.previous
+        self.previous = held
+        if actions.get('attack'):
+            taps |= ACTION_BITS['attack']
+        if actions.get('dodge'):
+            taps |= ACTION_BITS['dodge']
+        return held, taps
+
+class Replay:
+    """Input played back from a recording; every tick after the end is empty"""
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, self.seed, flags = RECORDING_HEADER.unpack_from(data)
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            raise ValueError(f"{path} is not a version {RECORDING_VERSION} input recording")
+        self.horde = bool(flags & FLAG_HORDE)
+        self.ticks = list(RECORDING_TICK.iter_unpack(data[RECORDING_HEADER.size:]))
+        self.position = 0
+
+    def finished(self):
+        return self.position >= len(self.ticks)
+
+    def read(self):
+        if self.finished():
+            return 0, 0
+        masks = self.ticks[self.position]
+        self.position += 1
+        return masks
+
+class InputSystem:
+    """Turns an input source into one ActionState per tick, optionally recording the stream
+
+    Level polls it once at the start of every tick, so everything in that
+    tick sees the same snapshot, and a recording replays tick for tick.
+    Presses are exactly the source's taps, so what happens between ticks
+    (a menu, a new Level) never turns an already held button into a press.
+    """
+    def __init__(self, source=None):
+        self.source = source or KeyboardMouse()
+        self.previous = 0  # Held mask of the last tick
+        self.state = ActionState()
+        self.recording = None  # Open file while recording
+
+    def handle_event(self, event):
+        """Feed a pygame event to live input (ignored by scripted and replayed input)"""
+        if isinstance(self.source, KeyboardMouse):
+            self.source.handle_event(event)
+
+    def poll(self):
+        """Read the next tick's snapshot from the source"""
+        held, taps = self.source.read()
+        if self.recording:
+            self.recording.write(RECORDING_TICK.pack(held, taps))
+        self.state = ActionState(held, taps, self.previous & ~held)
+        self.previous = held
+        return self.state
+
+    def start_recording(self, path, seed, horde=False):
+        """Write every following tick to path; seed is what random was seeded with for this run"""
+        self.stop_recording()
+        self.recording = open(path, 'wb')
+        self.recording.write(RECORDING_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION, seed, FLAG_HORDE if horde else 0))
+
+    def stop_recording(self):
+        if self.recording:
+            self.recording.close()
+            self.recording = None
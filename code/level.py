@@ -1,42 +1,70 @@
 import pygame
 from code.settings import *
-from code.tiled import Tile
-from code.player import Player, AttackHitbox
-from code.enemy import Goblin, Boss
+from code.player import Player
+from code.enemy import Goblin, Boss, goblin_stats
 from code.ui import UI
-import pytmx
+from code.spatial import ObstacleGroup, SpatialGrid
+from code.profiler import profiler
+from code.maps import map_cache
+from code.tiled import InteractableObject
+from code.assets import assets, BackgroundLoader
+from code.audio import music, sfx
+from code.combat import CombatSystem
+from code.navigation import FlowField
+from code.steering import steer_sprites
+from code.scheduler import AIScheduler
+from code.input import InputSystem
+from entity import Entity as EnemyRecord
 import os
 import random
+import heapq
+from itertools import chain
 
 class Level:
-    def __init__(self):
+    def __init__(self, render=True, horde=None, controls=None):
         
         # get display surface
         self.display_surface = pygame.display.get_surface()
+        self.render = render  # False skips all drawing (headless simulation)
+        
+        # Per-tick action snapshots from the keyboard and mouse, a script or a replay
+        self.input = controls or InputSystem()
+        
+        # Horde mode keeps goblins in NumPy arrays instead of sprites (PROJECT_M_HORDE=1)
+        if horde is None:
+            horde = os.environ.get('PROJECT_M_HORDE', '') not in ('', '0')
+        self.horde = create_horde() if horde else None
         
         # Sprite groups
         self.visible_sprites = YsortCameraGroup()
-        self.ground_sprites = pygame.sprite.Group()  # Ground tiles (no Y-sort)
         self.decoration_sprites = pygame.sprite.Group()  # Decoration tiles (Y-sort)
-        self.obstacle_sprites = pygame.sprite.Group()
+        self.obstacle_sprites = ObstacleGroup()  # Obstacles with a static spatial index
         self.enemy_sprites = pygame.sprite.Group()  # Enemy group
         self.interactable_sprites = pygame.sprite.Group()  # Interactable objects
         
+        # Attack hitboxes and hit resolution
+        self.combat = CombatSystem()
+        self.combat.horde = self.horde
+        
+        # Off-screen enemies update at a reduced rate
+        self.scheduler = AIScheduler()
+        if self.horde:
+            self.visible_sprites.extra_sources.append(self.horde)
+        
         # sprite setup
         self.create_map()
-
-        # attack hitbox
-        self.current_attack_hitbox = None
-        self.goblin_attack_hitboxes = {}  # Track goblin attack hitboxes
+        sfx.preload()
         
         # Goblin spawning
         self.spawn_timer = 0
-        self.spawn_interval = 150  # 2.5 seconds at 60 FPS
+        self.spawn_interval = 2.5  # seconds
         self.base_max_enemies = 5
         self.max_goblins = self.base_max_enemies
         
         # Interaction tracking
         self.near_interactable = None
+        self.arena_preload = None  # Worker reading the boss arena's files once the player reaches the portal
+        self.arena_built = False  # Whether the preloaded files have been turned into surfaces
 
         # Arena and Boss tracking
         self.arena = "Mob"
@@ -44,18 +72,6 @@ class Level:
         self.boss_spawned = False
         
     def create_map(self):
-        # Load TMX map file
-        tmx_path = os.path.join('assets', 'maps', 'Inimapbang1.tmx')
-        tmx_data = pytmx.load_pygame(tmx_path)
-        
-        # Store map dimensions for boundary
-        self.map_width = tmx_data.width * TILESIZE
-        self.map_height = tmx_data.height * TILESIZE
-        self.map_rect = pygame.Rect(0, 0, self.map_width, self.map_height)
-        
-        # Track current attack hitbox
-        self.current_attack_hitbox = None
-        
         # Default player spawn position
         player_pos = (1024, 1700)
         
@@ -64,87 +80,59 @@ class Level:
 
         self.ui = UI(self.player)
         
+        # Add the (cached) map after the player, like change_map does
+        self.load_map('Inimapbang1.tmx')
 
-        # Render all layers
-        for layer in tmx_data.visible_layers:
-            if isinstance(layer, pytmx.TiledTileLayer):
-                for x, y, gid in layer:
-                    tile = tmx_data.get_tile_image_by_gid(gid)
-                    if tile:
-                        # Check if layer is Decoration layer for Y-sorting
-                        if layer.name == 'Decoration':
-                            Tile((x * TILESIZE, y * TILESIZE), [self.visible_sprites, self.decoration_sprites], tile)
-                        else:
-                            Tile((x * TILESIZE, y * TILESIZE), [self.visible_sprites, self.ground_sprites], tile)
-            elif isinstance(layer, pytmx.TiledObjectGroup):
-                for obj in layer:
-                    if obj.image:
-                        scaled_image = pygame.transform.scale(obj.image, (int(obj.width), int(obj.height)))
-                        # Check if object is interactable via custom properties
-                        is_interactable = obj.properties.get('interactable', False)
-                        if is_interactable:
-                            # Create interactable object
-                            InteractableObject(
-                                (obj.x, obj.y), 
-                                [self.visible_sprites, self.decoration_sprites, self.interactable_sprites, self.obstacle_sprites],
-                                scaled_image,
-                                obj.properties.get('name', 'Object'),
-                                obj.properties.get('message', 'An interactable object.')
-                            )
-                        else:
-                            # Regular obstacle
-                            Tile((obj.x, obj.y), [self.visible_sprites, self.decoration_sprites, self.obstacle_sprites], scaled_image)
+    def load_map(self, map_name):
+        """Swap in a map's pre-built ground layer, sprites and indexes from the map cache"""
+        map_data = map_cache.get(map_name)
+        
+        # Store map dimensions for boundary
+        self.map_width = map_data.width
+        self.map_height = map_data.height
+        self.map_rect = map_data.map_rect
+        self.ground_layer = map_data.ground_layer  # Ground tiles (no Y-sort)
+        
+        # Put the map sprites into this level's groups, in the order they were built
+        role_groups = {
+            'decoration': [self.visible_sprites, self.decoration_sprites],
+            'obstacle': [self.visible_sprites, self.decoration_sprites, self.obstacle_sprites],
+            'interactable': [self.visible_sprites, self.decoration_sprites, self.interactable_sprites, self.obstacle_sprites],
+        }
+        for sprite, role in map_data.sprites:
+            sprite.kill()  # Leave the groups of any previous Level (e.g. before a restart)
+            sprite.add(role_groups[role])
+        
+        # Reuse the obstacle index and pre-sorted draw order built with the map
+        self.obstacle_sprites.use_index(map_data.obstacle_grid)
+        self.visible_sprites.use_static_index(map_data.draw_index)
+        
+        # Blocked-tile mask for batched steering and horde movement (None without NumPy)
+        self.nav_grid = map_data.nav_grid
+        self.flow_fields = {}  # enemy body size -> FlowField toward the player on this map
+        self.spawn_points = map_data.spawn_points
+        self.spawn_zones = map_data.spawn_zones
+        if self.horde:
+            self.horde.nav = self.nav_grid
 
     def change_map(self, new_map_path, player_spawn_pos):
         # Clear existing sprites
         self.visible_sprites.empty()
-        self.ground_sprites.empty()
         self.decoration_sprites.empty()
         self.obstacle_sprites.empty()
         self.enemy_sprites.empty()
         self.interactable_sprites.empty()
-        self.goblin_attack_hitboxes.clear()
-        self.current_attack_hitbox = None
+        self.combat.clear()
+        self.scheduler.clear()
         self.near_interactable = None
+        if self.horde:
+            self.horde.clear()
         
-        # Change music based on map
+        # Change music based on map (the music manager fades between tracks it already holds in memory)
         if 'Boss_field' in new_map_path or 'boss_field' in new_map_path:
-            # Play boss fight music
-            try:
-                boss_music_path = os.path.join("audio", "boss_fight.mp3")
-                if os.path.exists(boss_music_path):
-                    pygame.mixer.music.stop()
-                    pygame.mixer.music.load(boss_music_path)
-                    pygame.mixer.music.set_volume(0.3)
-                    pygame.mixer.music.play(-1)
-                    print(f"Playing boss fight music from {boss_music_path}")
-                else:
-                    print(f"Boss fight music not found: {boss_music_path}")
-            except Exception as e:
-                print(f"Warning: Could not load boss fight music: {e}")
+            music.play('boss')
         else:
-            # Play normal background music for regular maps
-            try:
-                bg_music_path = os.path.join("audio", "background.mp3")
-                if os.path.exists(bg_music_path):
-                    pygame.mixer.music.stop()
-                    pygame.mixer.music.load(bg_music_path)
-                    pygame.mixer.music.set_volume(0.2)
-                    pygame.mixer.music.play(-1)
-                    print(f"Playing background music from {bg_music_path}")
-                else:
-                    print(f"Background music not found: {bg_music_path}")
-            except Exception as e:
-                print(f"Warning: Could not load background music: {e}")
-        
-        # Load new TMX map file
-        new_map_path = os.path.join('assets', 'maps', new_map_path)
-        tmx_data = pytmx.load_pygame(new_map_path)
-        
-        # Store map dimensions for boundary
-        self.map_width = tmx_data.width * TILESIZE
-        self.map_height = tmx_data.height * TILESIZE
-        self.map_rect = pygame.Rect(0, 0, self.map_width, self.map_height)
+            music.play('background')
         
         # Create player at new spawn position
         self.player.rect.topleft = player_spawn_pos
@@ -152,40 +140,41 @@ class Level:
         self.visible_sprites.add(self.player)
         self.decoration_sprites.add(self.player)
         
-        # Render all layers
-        for layer in tmx_data.visible_layers:
-            if isinstance(layer, pytmx.TiledTileLayer):
-                for x, y, gid in layer:
-                    tile = tmx_data.get_tile_image_by_gid(gid)
-                    if tile:
-                        # Check if layer is Decoration layer for Y-sorting
-                        if layer.name == 'Decoration':
-                            Tile((x * TILESIZE, y * TILESIZE), [self.visible_sprites, self.decoration_sprites], tile)
-                        else:
-                            Tile((x * TILESIZE, y * TILESIZE), [self.visible_sprites, self.ground_sprites], tile)
-            elif isinstance(layer, pytmx.TiledObjectGroup):
-                for obj in layer:
-                    if obj.image:
-                        scaled_image = pygame.transform.scale(obj.image, (int(obj.width), int(obj.height)))
-                        # Check if object is interactable via custom properties
-                        is_interactable = obj.properties.get('interactable', False)
-                        if is_interactable:
-                            # Create interactable object
-                            InteractableObject(
-                                (obj.x, obj.y), 
-                                [self.visible_sprites, self.decoration_sprites, self.interactable_sprites, self.obstacle_sprites],
-                                scaled_image,
-                                obj.properties.get('name', 'Object'),
-                                obj.properties.get('message', 'An interactable object.')
-                            )
-                        else:
-                            Tile((obj.x, obj.y), [self.visible_sprites, self.decoration_sprites, self.obstacle_sprites], scaled_image)
+        # Swap in the new map (parsed and built only the first time it is used)
+        self.load_map(new_map_path)
+        
+        # Don't interpolate the player across the map change
+        self.visible_sprites.store_previous_positions()
         
     def run(self):
+        """Advance one fixed tick and draw it (used by headless runs)"""
+        result = self.update(TICK_TIME)
+        if self.render:
+            self.draw()
+        return result
+
+    def update(self, dt):
+        """Advance the simulation by dt seconds"""
+        # One input snapshot per tick, shared by everything that reads input this tick
+        self.player.actions = self.input.poll()
+        if profiler.enabled:
+            profiler.count('sfx voices', sfx.active_voices())
+
+        # Remember where moving sprites were so drawing can interpolate between ticks
+        self.visible_sprites.store_previous_positions()
+        if self.horde:
+            self.horde.store_previous_positions()
+
         if self.arena == "Mob":
-            self.visible_sprites.update(self.map_rect) 
-            self.visible_sprites.custom_draw(self.player, self.ground_sprites, self.decoration_sprites, self.map_rect)
-            self.ui.display()
+            with profiler.section('update'):
+                # Steer every sprite goblin at once before they move
+                goblins = [enemy for enemy in self.enemy_sprites if isinstance(enemy, Goblin)]
+                if goblins:
+                    steer_sprites(goblins, self.player.rect.center, self.nav_grid, self.flow_field(goblins[0].hitbox.size))
+                self.update_sprites(dt)
+                if self.horde:
+                    self.horde.flow = self.flow_field(self.horde.body_size)
+                    self.horde.update(self.player, self.map_rect, dt)
             
             # Check collision with interactable objects
             self.near_interactable = None
@@ -194,13 +183,18 @@ class Level:
                     self.near_interactable = interactable
                     break
             
-            # Display interaction prompt if near an object
-            if self.near_interactable:
-                self.ui.display_interaction_prompt()
+            # Start building the boss arena in the background as soon as the player reaches the portal
+            if self.near_interactable and self.arena_preload is None:
+                self.arena_preload = BackgroundLoader(self.preload_boss_arena)
+            if self.arena_preload and not self.arena_built and self.arena_preload.ready():
+                self.build_boss_arena()
             
-            # Handle interaction (E key)
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_e] and self.near_interactable:
+            # Handle interaction (E key). A press before the preload is done finishes it right here
+            # instead of being dropped, so entering the arena depends only on the input, never on thread timing
+            if self.player.actions.pressed('interact') and self.near_interactable:
+                if not self.arena_built:
+                    self.arena_preload.wait()
+                    self.build_boss_arena()
                 self.near_interactable.interact(self, self.change_map)
             
             # Check if player is dead
@@ -211,73 +205,100 @@ class Level:
             self.update_difficulty()
             
             # Spawn goblins
-            self.spawn_timer += 1
-            if self.spawn_timer >= self.spawn_interval:
-                if len(self.enemy_sprites) < self.max_goblins:
-                    self.spawn_goblin()
-                self.spawn_timer = 0
-            
-            # Check player attack hitting goblins
-            if self.current_attack_hitbox:
-                for goblin in self.enemy_sprites:
-                    if self.current_attack_hitbox.rect.colliderect(goblin.hitbox):
-                        if goblin.invincibility_timer <= 0:
-                            goblin.take_damage(self.player.attack_power)
+            with profiler.section('spawn'):
+                self.spawn_timer += dt
+                if self.spawn_timer >= self.spawn_interval:
+                    if self.enemy_count() < self.max_goblins:
+                        self.spawn_wave()
+                    self.spawn_timer = 0
             
-            # Check goblin attacks hitting player
-            for goblin, hitbox in list(self.goblin_attack_hitboxes.items()):
-                if hitbox and hitbox.rect.colliderect(self.player.hitbox):
-                    if self.player.invincibility_timer <= 0:
-                        self.player.take_damage(goblin.attack_power)
-            
-            # Remove dead goblins and give exp
-            for goblin in self.enemy_sprites.copy():
-                if goblin.health <= 0:
+            with profiler.section('hits'):
+                # Resolve every hit this tick and give exp for the kills
+                for goblin in self.combat.resolve(self.player):
                     self.player.gain_exp(20)  # 20 exp per kill
+                    self.scheduler.forget(goblin)
                     goblin.kill()
-                    if goblin in self.goblin_attack_hitboxes:
-                        if self.goblin_attack_hitboxes[goblin]:
-                            self.goblin_attack_hitboxes[goblin].kill()
-                        del self.goblin_attack_hitboxes[goblin]
+                if self.horde:
+                    for record in self.horde.remove_dead():
+                        self.player.gain_exp(20)
 
         if self.arena == "Boss":
-            self.visible_sprites.update(self.map_rect) 
-            self.visible_sprites.custom_draw(self.player, self.ground_sprites, self.decoration_sprites, self.map_rect)
-            self.ui.display()
-            
-            # Display boss HP bar
-            if self.boss:
-                self.ui.draw_boss_health_bar(self.boss)
+            with profiler.section('update'):
+                if self.boss:
+                    self.boss.flow_field = self.flow_field(self.boss.hitbox.size)
+                self.update_sprites(dt)
 
             if self.player.health <= 0:
                 return {'game_over': True}
             
-            # Check player attack hitting boss
-            if self.current_attack_hitbox and self.boss:
-                if self.current_attack_hitbox.rect.colliderect(self.boss.hitbox):
-                    if self.boss.invincibility_timer <= 0:
-                        self.boss.take_damage(self.player.attack_power)
-            
-            # Check boss attack hitting player
-            if self.boss and self.boss in self.goblin_attack_hitboxes:
-                hitbox = self.goblin_attack_hitboxes[self.boss]
-                if hitbox and hitbox.rect.colliderect(self.player.hitbox):
-                    if self.player.invincibility_timer <= 0:
-                        self.player.take_damage(self.boss.attack_power)
+            with profiler.section('hits'):
+                dead = self.combat.resolve(self.player)
             
             # Check if boss is dead
-            if self.boss and self.boss.health <= 0:
+            if self.boss and self.boss in dead:
                 self.player.gain_exp(200)  # Big exp reward for boss kill
                 self.boss.kill()
-                if self.boss in self.goblin_attack_hitboxes:
-                    if self.goblin_attack_hitboxes[self.boss]:
-                        self.goblin_attack_hitboxes[self.boss].kill()
-                    del self.goblin_attack_hitboxes[self.boss]
                 self.boss = None
                 self.boss_spawned = False
                 self.arena = "Mob"  # Return to mob arena
                 # Change map back to original map
                 self.change_map('Inimapbang1.tmx', (1024, 1700))
+
+    def update_sprites(self, dt):
+        """Update the player, then the enemies through the level-of-detail scheduler"""
+        self.player.update(self.map_rect, dt)
+        view = self.visible_sprites.view_rect(self.player.rect.center, self.map_rect)
+        self.scheduler.update(self.enemy_sprites, view, self.map_rect, dt)
+
+    def draw(self, alpha=1.0):
+        """Draw the level with moving sprites interpolated alpha of the way through the last tick"""
+        with profiler.section('draw'):
+            self.visible_sprites.custom_draw(self.player, self.ground_layer, self.decoration_sprites, self.map_rect, alpha)
+            if self.combat.debug:
+                self.combat.debug_draw(self.display_surface, self.visible_sprites.offset)
+        # Sound effects are culled by distance from what the camera shows
+        sfx.listener = self.visible_sprites.camera_center()
+        with profiler.section('ui'):
+            self.ui.display()
+            
+            # Display interaction prompt if near an object
+            if self.arena == "Mob" and self.near_interactable:
+                self.ui.display_interaction_prompt(self.arena_built)
+            
+            # Display boss HP bar
+            if self.arena == "Boss" and self.boss:
+                self.ui.draw_boss_health_bar(self.boss)
+    
+    def preload_boss_arena(self):
+        """Parse the boss map and decode its images and the boss sheet (runs on a worker thread)
+
+        Only files and plain memory surfaces are touched here; everything
+        converted for the display is made by build_boss_arena() on the main thread.
+        """
+        map_cache.preload(InteractableObject.destination)
+        if Boss.animations is None:  # Only the first Level to reach the portal needs the sheet
+            assets.decode_image(Boss.sheet_path)
+    
+    def build_boss_arena(self):
+        """Turn the preloaded files into the boss map's surfaces and the boss frames (main thread)"""
+        map_cache.get(InteractableObject.destination)
+        Boss.load_animations()
+        self.arena_built = True
+    
+    def flow_field(self, body_size):
+        """The map's flow field toward the player for one enemy body size, brought up to date (None without NumPy)"""
+        if self.nav_grid is None:
+            return None
+        field = self.flow_fields.get(body_size)
+        if field is None:
+            field = self.flow_fields[body_size] = FlowField(self.nav_grid, body_size)
+        with profiler.section('pathfinding'):
+            if field.update(self.player.rect.center):
+                profiler.count('flow recomputes', sum(other.recomputes for other in self.flow_fields.values()))
+        return field
+    
+    def enemy_count(self):
+        return len(self.enemy_sprites) + (self.horde.count if self.horde else 0)
     
     def update_difficulty(self):
         """Update difficulty based on player level"""
@@ -285,21 +306,40 @@ class Level:
         level_tier = (self.player.level - 1)
         self.max_goblins = self.base_max_enemies + level_tier
     
-    def spawn_goblin(self):
-        """Spawn goblin enemy"""
-        # Random spawn position away from player
-        margin = 200
-        attempts = 0
-        while attempts < 10:
-            x = random.randint(margin, self.map_width - margin)
-            y = random.randint(margin, self.map_height - margin)
-            if abs(x - self.player.rect.centerx) > 300 or abs(y - self.player.rect.centery) > 300:
+    def spawn_wave(self):
+        """Spawn the next batch: a wave from one of the map's spawn zones, or one goblin on maps without zones"""
+        zones = [zone for zone in self.spawn_zones if len(zone.points)]
+        if not zones:
+            self.spawn_goblin()
+            return
+        zone = random.choice(zones)
+        for _ in range(min(zone.wave_size, self.max_goblins - self.enemy_count())):
+            if not self.spawn_goblin(zone.points):
                 break
-            attempts += 1
+    
+    def spawn_goblin(self, points=None):
+        """Spawn one goblin at a walkable point away from the player and off screen; False if none qualifies"""
+        if points is None:
+            points = self.spawn_points
+        # Goblin sprites are 128x128: keep the whole sprite outside the camera view
+        hidden_from = self.visible_sprites.view_rect(self.player.rect.center, self.map_rect).inflate(128, 128)
+        point = points.sample(self.player.rect.center, SPAWN_MIN_DISTANCE, hidden_from)
+        if point is None:
+            return False
+        x, y = point[0] - 64, point[1] - 64
+        
+        if self.horde:
+            health, attack_power, defense = goblin_stats(self.player.level)
+            record = EnemyRecord(None, (x, y))
+            record.health = health
+            record.damage = attack_power
+            self.horde.spawn(record, defense)
+            return True
         
         goblin = Goblin((x, y), [self.visible_sprites, self.decoration_sprites, self.enemy_sprites], 
                        self.obstacle_sprites, self.player, self.create_goblin_attack_hitbox, self.delete_goblin_attack_hitbox)
-        self.goblin_attack_hitboxes[goblin] = None
+        self.combat.add_enemy(goblin)
+        return True
 
     def spawn_boss(self):
         """Spawn boss enemy in center of map"""
@@ -307,55 +347,28 @@ class Level:
         boss_y = self.map_height // 2
         self.boss = Boss((boss_x, boss_y), [self.visible_sprites, self.decoration_sprites, self.enemy_sprites], 
                     self.obstacle_sprites, self.player, self.create_goblin_attack_hitbox, self.delete_goblin_attack_hitbox)
-        self.goblin_attack_hitboxes[self.boss] = None
+        self.combat.add_enemy(self.boss)
     
     def create_attack_hitbox(self):
-        # Delete previous hitbox if it exists
-        if self.current_attack_hitbox:
-            self.current_attack_hitbox.kill()
-        self.current_attack_hitbox = AttackHitbox(self.player, [self.visible_sprites, self.decoration_sprites])
+        self.combat.spawn_player_attack(self.player)
 
     def delete_attack_hitbox(self):
-        if self.current_attack_hitbox:
-            self.current_attack_hitbox.kill()
-            self.current_attack_hitbox = None
+        self.combat.clear_player_attack()
     
     def create_goblin_attack_hitbox(self, goblin):
-        # Delete previous hitbox if it exists
-        if goblin in self.goblin_attack_hitboxes and self.goblin_attack_hitboxes[goblin]:
-            self.goblin_attack_hitboxes[goblin].kill()
-        self.goblin_attack_hitboxes[goblin] = GoblinAttackHitbox(goblin, [self.visible_sprites, self.decoration_sprites])
+        self.combat.spawn_enemy_attack(goblin)
     
     def delete_goblin_attack_hitbox(self, goblin):
-        if goblin in self.goblin_attack_hitboxes and self.goblin_attack_hitboxes[goblin]:
-            self.goblin_attack_hitboxes[goblin].kill()
-            self.goblin_attack_hitboxes[goblin] = None
-
-class GoblinAttackHitbox(pygame.sprite.Sprite):
-    def __init__(self, goblin, groups):
-        super().__init__(groups)
-        orientation = goblin.orientation
-        self.image = pygame.Surface((64, 64), pygame.SRCALPHA)
-        # Completely transparent - no visible color
-        self.image.fill((0, 0, 0, 0))
-        if orientation == 'right':
-            self.rect = self.image.get_rect(center=(goblin.rect.right, goblin.rect.centery))
-        else:
-            self.rect = self.image.get_rect(center=(goblin.rect.left, goblin.rect.centery))
+        self.combat.clear_enemy_attack(goblin)
 
-class InteractableObject(pygame.sprite.Sprite):
-    def __init__(self, pos, groups, image, name, message):
-        super().__init__(groups)
-        self.image = image
-        self.rect = self.image.get_rect(topleft=pos)
-        self.hitbox = self.rect.inflate(-100, -100)  # Slightly smaller hitbox for better collision
-        self.name = name
-        self.message = message
-    
-    def interact(self, level, change_map):
-        level.arena = "Boss"
-        change_map('Boss_field.tmx', (500, 500))
-        level.spawn_boss()
+def create_horde():
+    """Array-backed goblin store, or None when NumPy is not installed"""
+    try:
+        from code.horde import HordeStore
+    except ImportError as e:
+        print(f"Warning: Horde mode needs NumPy, using sprite goblins: {e}")
+        return None
+    return HordeStore()
 
 class YsortCameraGroup(pygame.sprite.Group):
     def __init__(self):
@@ -365,10 +378,53 @@ class YsortCameraGroup(pygame.sprite.Group):
         self.half_height = self.display_surface.get_size()[1] // 2
         self.offset = pygame.math.Vector2()
 
-    def custom_draw(self, player, ground_sprites, decoration_sprites, map_rect):
-        # Calculate offset based on player position
-        self.offset.x = player.rect.centerx - self.half_width
-        self.offset.y = player.rect.centery - self.half_height
+        # Draw order bookkeeping
+        self.static_sprites = {}  # Map tiles and objects that never move
+        self.dynamic_sprites = {}  # Player, enemies and hitboxes
+        self.static_index = None  # Static sprites bucketed in Y-sorted order
+        self.add_order = {}
+        self.next_order = 0
+        self.extra_sources = []  # Objects that materialize sprites for the view each frame (horde mode)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.add_order[sprite] = self.next_order
+        self.next_order += 1
+        if getattr(sprite, 'static', False):
+            self.static_sprites[sprite] = None
+            self.static_index = None
+        else:
+            self.dynamic_sprites[sprite] = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        del self.add_order[sprite]
+        if sprite in self.static_sprites:
+            del self.static_sprites[sprite]
+            self.static_index = None
+        else:
+            del self.dynamic_sprites[sprite]
+
+    def sort_key(self, sprite):
+        # Ties keep the order sprites joined the group
+        return (sprite.rect.bottom, self.add_order.get(sprite, self.next_order))
+
+    def store_previous_positions(self):
+        """Record where moving sprites are before a tick for render interpolation"""
+        for sprite in self.dynamic_sprites:
+            sprite.previous_topleft = sprite.rect.topleft
+
+    def render_offset(self, sprite, alpha):
+        """How far behind its current rect a sprite is drawn at this interpolation point"""
+        previous = getattr(sprite, 'previous_topleft', None)
+        if previous is None or alpha >= 1:
+            return (0, 0)
+        return ((previous[0] - sprite.rect.x) * (1 - alpha), (previous[1] - sprite.rect.y) * (1 - alpha))
+
+    def camera_offset(self, center, map_rect):
+        """Top-left of a view centred on a world position, clamped to the map"""
+        x = center[0] - self.half_width
+        y = center[1] - self.half_height
         
         # Clamp camera to map boundaries
         # Don't let camera show area outside the map
@@ -377,29 +433,64 @@ class YsortCameraGroup(pygame.sprite.Group):
         
         # If map is smaller than screen, center it
         if map_rect.width < screen_width:
-            self.offset.x = (map_rect.width - screen_width) // 2
+            x = (map_rect.width - screen_width) // 2
         else:
             # Clamp camera so it doesn't go beyond map edges
-            self.offset.x = max(0, min(self.offset.x, map_rect.width - screen_width))
+            x = max(0, min(x, map_rect.width - screen_width))
         
         if map_rect.height < screen_height:
-            self.offset.y = (map_rect.height - screen_height) // 2
+            y = (map_rect.height - screen_height) // 2
         else:
-            self.offset.y = max(0, min(self.offset.y, map_rect.height - screen_height))
+            y = max(0, min(y, map_rect.height - screen_height))
+        return x, y
 
-        # Draw ground sprites first (no Y-sort needed)
-        for sprite in ground_sprites:
-            offset_pos = sprite.rect.topleft - self.offset
-            self.display_surface.blit(sprite.image, offset_pos)
+    def view_rect(self, center, map_rect):
+        """World rect the camera shows when centred on a world position"""
+        x, y = self.camera_offset(center, map_rect)
+        return pygame.Rect(int(x), int(y), self.display_surface.get_width(), self.display_surface.get_height())
+
+    def camera_center(self):
+        """World position at the centre of the last drawn view"""
+        return (self.offset.x + self.half_width, self.offset.y + self.half_height)
+
+    def use_static_index(self, grid):
+        """Adopt a static draw index prebuilt (already Y-sorted) for exactly this group's static sprites"""
+        self.static_index = grid
+
+    def build_static_index(self):
+        """Pre-sort static sprites once so each frame only sorts the moving ones"""
+        self.static_index = SpatialGrid(CHUNK_SIZE)
+        for sprite in sorted(self.static_sprites, key=self.sort_key):
+            self.static_index.insert(sprite, sprite.rect)
+
+    def custom_draw(self, player, ground_layer, decoration_sprites, map_rect, alpha=1.0):
+        # Calculate offset based on the interpolated player position
+        player_dx, player_dy = self.render_offset(player, alpha)
+        self.offset.x, self.offset.y = self.camera_offset((player.rect.centerx + player_dx, player.rect.centery + player_dy), map_rect)
+        screen_width = self.display_surface.get_width()
+        screen_height = self.display_surface.get_height()
+
+        # Draw pre-rendered ground chunks first (no Y-sort needed)
+        ground_layer.draw(self.display_surface, self.offset)
+        
+        # Cull to the camera view, sort only the moving sprites and merge them into the pre-sorted statics
+        view = pygame.Rect(int(self.offset.x), int(self.offset.y), screen_width, screen_height)
+        if self.static_index is None:
+            self.build_static_index()
+        visible_static = [sprite for sprite in self.static_index.query(view) if sprite.rect.colliderect(view)]
+        materialized = [sprite for source in self.extra_sources for sprite in source.sprites_in_view(view)]
+        visible_dynamic = sorted(chain((sprite for sprite in self.dynamic_sprites if sprite.rect.colliderect(view)), materialized), key=self.sort_key)
         
         # Draw all visible sprites with Y-sort (includes player, enemies, portals, decorations)
-        for sprite in sorted(self.sprites(), key=lambda sprite: sprite.rect.bottom):
-            if sprite not in ground_sprites:  # Don't draw ground sprites twice
-                offset_pos = sprite.rect.topleft - self.offset
-                self.display_surface.blit(sprite.image, offset_pos)
+        # (one batched blit call instead of one call per sprite)
+        self.display_surface.fblits([
+            (sprite.image, sprite.rect.topleft - self.offset + self.render_offset(sprite, alpha))
+            for sprite in heapq.merge(visible_static, visible_dynamic, key=self.sort_key)
+        ])
         
         # Draw health bars for enemies (Goblin only, not Boss)
-        from code.enemy import Goblin
-        for sprite in self.sprites():
-            if isinstance(sprite, Goblin):
-                sprite.draw_health_bar(self.display_surface, -self.offset)
\ No newline at end of file
+        for sprite in self.dynamic_sprites:
+            if isinstance(sprite, Goblin) and sprite.rect.colliderect(view):
+                sprite.draw_health_bar(self.display_surface, -self.offset + self.render_offset(sprite, alpha))
+        for sprite in materialized:
+            sprite.draw_health_bar(self.display_surface, -self.offset + self.render_offset(sprite, alpha))
\ No newline at end of file
@@ -1,8 +1,12 @@
 import pygame, sys
 import os
+import time
+import random
 from code.settings import *
 from code.level import *
-from code.ui import Menu, PauseMenu, GameOverMenu
+from code.ui import Menu, PauseMenu, GameOverMenu, ProfilerOverlay
+from code.profiler import profiler
+from code.audio import music
 
 # Initialize pygame and mixer properly
 pygame.init()
@@ -29,150 +33,170 @@ class Game:
 		self.pause_menu = PauseMenu()
 		self.game_over_menu = GameOverMenu()
 		self.level = None
+
+		# Frame-time overlay (F3, or PROJECT_M_PROFILE=1 to start enabled)
+		self.profiler_overlay = ProfilerOverlay()
+
+		# Read the music tracks into memory while the menu is up
+		music.preload()
+
+		# PROJECT_M_RECORD=path writes the input of every run to its own numbered recording (see code.headless --replay)
+		self.record_path = os.environ.get('PROJECT_M_RECORD')
+		self.recorded_runs = 0
 	
-	def show_menu(self):
-		# Play background music from the start
-		print("show_menu() called - attempting to play background music...")
-		try:
-			music_path = os.path.join("audio", "background.mp3")
-			print(f"Looking for background music at: {music_path}")
-			print(f"File exists: {os.path.exists(music_path)}")
+	def next_recording_path(self):
+		"""PROJECT_M_RECORD with the next run number added, skipping files that already exist"""
+		base, extension = os.path.splitext(self.record_path)
+		while True:
+			self.recorded_runs += 1
+			path = f"{base}-{self.recorded_runs}{extension}"
+			if not os.path.exists(path):
+				return path
+	
+	def new_level(self):
+		"""Start a fresh level, recording its input when asked to"""
+		if self.level:
+			self.level.input.stop_recording()
+		if not self.record_path:
+			return Level()
+		# Spawns depend on random, so a recording stores the seed its run started from
+		seed = random.randrange(2 ** 31)
+		random.seed(seed)
+		level = Level()
+		path = self.next_recording_path()
+		level.input.start_recording(path, seed, level.horde is not None)
+		print(f"Recording input to {path}")
+		return level
+	
+	def run_menu(self, menu, cancel=None):
+		"""Show a menu until an option is chosen and return its index
+
+		Sleeps on the event queue instead of polling, and redraws only when
+		the selection changes or the window needs repainting. ESC chooses
+		`cancel` when given.
+		"""
+		redraw = True
+		while True:
+			if redraw:
+				menu.display()
+				pygame.display.flip()
+				redraw = False
 			
-			if os.path.exists(music_path):
-				pygame.mixer.music.stop()
-				pygame.mixer.music.load(music_path)
-				pygame.mixer.music.set_volume(0.2)
-				pygame.mixer.music.play(-1)
-				print(f"Successfully loaded and playing background music")
+			event = pygame.event.wait(MENU_IDLE_TIMEOUT)
+			music.update()  # Keep track changes going while idle
+			if event.type == pygame.NOEVENT:
+				continue
+			if event.type == pygame.QUIT:
+				pygame.quit()
+				sys.exit()
+			if event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.WINDOWSIZECHANGED):
+				redraw = True
+			if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE and cancel is not None:
+				choice = cancel
 			else:
-				print(f"Background music not found: {music_path}")
-		except Exception as e:
-			print(f"Error loading background music: {e}")
-			import traceback
-			traceback.print_exc()
+				selected = menu.selected
+				choice = menu.handle_event(event)
+				redraw = redraw or menu.selected != selected
+			if choice is not None:
+				# Fresh clock, so the game does not try to catch up on the time spent here
+				self.clock = pygame.time.Clock()
+				return choice
+	
+	def show_menu(self):
+		# Play background music from the start
+		music.play('background')
 		
 		while self.state == 'menu':
-			for event in pygame.event.get():
-				if event.type == pygame.QUIT:
-					pygame.quit()
-					sys.exit()
-			
-			# Handle menu input
-			choice = self.menu.handle_input()
-			
+			choice = self.run_menu(self.menu)
 			if choice == 0:  # Start Game
 				self.state = 'playing'
-				self.level = Level()  # Initialize level when starting game
+				self.level = self.new_level()  # Initialize level when starting game
 			elif choice == 1:  # Quit
 				pygame.quit()
 				sys.exit()
-			
-			# Draw menu
-			self.menu.display()
-			pygame.display.flip()
-			self.clock.tick(FPS)
 	
 	def show_pause_menu(self):
-		esc_pressed = False
-		while self.state == 'paused':
-			for event in pygame.event.get():
-				if event.type == pygame.QUIT:
-					pygame.quit()
-					sys.exit()
-				if event.type == pygame.KEYDOWN:
-					if event.key == pygame.K_ESCAPE:
-						if not esc_pressed:
-							esc_pressed = True
-							self.state = 'playing'
-							pygame.time.wait(200)
-							return
-			
-			# Handle pause menu input
-			choice = self.pause_menu.handle_input()
-			
-			if choice == 0:  # Continue
-				self.state = 'playing'
-				pygame.time.wait(200)
-				return
-			elif choice == 1:  # Main Menu
-				self.state = 'menu'
-				self.show_menu()
-				return
-			elif choice == 2:  # Quit
-				pygame.quit()
-				sys.exit()
-			
-			# Draw game in background
-			self.screen.fill('black')
-			self.level.visible_sprites.custom_draw(self.level.player, self.level.ground_sprites, self.level.decoration_sprites, self.level.map_rect)
-			self.level.ui.display()
-			
-			# Draw pause menu on top
-			self.pause_menu.display()
-			pygame.display.flip()
-			self.clock.tick(FPS)
+		# The game stays frozen, so its last frame is kept (darkened once) instead of redrawn
+		self.pause_menu.freeze(self.screen)
+		choice = self.run_menu(self.pause_menu, cancel=0)  # ESC continues
+		
+		if choice == 0:  # Continue
+			self.state = 'playing'
+		elif choice == 1:  # Main Menu
+			self.state = 'menu'
+			self.show_menu()
+		elif choice == 2:  # Quit
+			pygame.quit()
+			sys.exit()
 	
 	def show_game_over(self):
-		while self.state == 'game_over':
-			for event in pygame.event.get():
-				if event.type == pygame.QUIT:
-					pygame.quit()
-					sys.exit()
-			
-			# Handle game over menu input
-			choice = self.game_over_menu.handle_input()
-			
-			if choice == 0:  # Restart
-				self.state = 'playing'
-				self.level = Level()  # Create new level
-				pygame.time.wait(200)
-				return
-			elif choice == 1:  # Main Menu
-				self.state = 'menu'
-				self.show_menu()
-				return
-			elif choice == 2:  # Quit
-				pygame.quit()
-				sys.exit()
-			
-			# Draw game over screen
-			self.screen.fill('black')
-			self.game_over_menu.display()
-			pygame.display.flip()
-			self.clock.tick(FPS)
+		self.game_over_menu.freeze(self.screen)
+		choice = self.run_menu(self.game_over_menu)
+		
+		if choice == 0:  # Restart
+			self.state = 'playing'
+			self.level = self.new_level()  # Create new level
+		elif choice == 1:  # Main Menu
+			self.state = 'menu'
+			self.show_menu()
+		elif choice == 2:  # Quit
+			pygame.quit()
+			sys.exit()
 	
 	def run(self):
 		# Show menu first
 		self.show_menu()
 		
-		# Game loop
+		# Game loop: the simulation advances in fixed TICK_TIME steps and
+		# drawing interpolates between the last two ticks
+		accumulator = 0.0
 		while True:
 			for event in pygame.event.get():
 				if event.type == pygame.QUIT:
 					pygame.quit()
 					sys.exit()
-				if event.type == pygame.MOUSEBUTTONDOWN:
-					if event.button == 1:
-						self.level.player.attack()
-					if event.button == 3:
-						self.level.player.dodge()
+				# Movement, attack, dodge and interact go through the level's input layer
+				self.level.input.handle_event(event)
 				if event.type == pygame.KEYDOWN:
 					if event.key == pygame.K_ESCAPE:
 						# Pause game
 						self.state = 'paused'
 						self.show_pause_menu()
+					if event.key == pygame.K_F2:
+						self.level.combat.debug = not self.level.combat.debug
+					if event.key == pygame.K_F3:
+						profiler.toggle()
+					if event.key == pygame.K_F4 and profiler.history:
+						path = profiler.dump_csv(f"profile_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+						print(f"Frame timings written to {path}")
 			
 			# game loop
-			self.screen.fill('black')
-			result = self.level.run()
+			frame_start = time.perf_counter()
+			accumulator += min(self.clock.get_time() / 1000, MAX_FRAME_TIME)
+			result = None
+			with profiler.section('level'):
+				while accumulator >= TICK_TIME:
+					result = self.level.update(TICK_TIME)
+					accumulator -= TICK_TIME
+					if result and result.get('game_over'):
+						break
 			
 			# Check for game over
 			if result and result.get('game_over'):
 				self.state = 'game_over'
 				self.show_game_over()
+				accumulator = 0.0
 				continue
 			
-			pygame.display.flip()
+			self.screen.fill('black')
+			self.level.draw(accumulator / TICK_TIME)
+			self.profiler_overlay.display()
+			music.update()
+			with profiler.section('flip'):
+				pygame.display.flip()
+			if profiler.enabled:
+				profiler.add('frame', time.perf_counter() - frame_start)
+				profiler.end_tick()
 			self.clock.tick(FPS)
 
 if __name__ == '__main__':
@@ -0,0 +1,168 @@
+import pygame
+import pytmx
+import os
+import threading
+from pytmx.util_pygame import handle_transformation, smart_convert
+from code.settings import *
+from code.tiled import Tile, InteractableObject, GroundLayer
+from code.spatial import SpatialGrid, build_obstacle_grid
+from code.spawning import SpawnZone, find_spawn_points
+from code.navigation import NavGrid, NUMPY_AVAILABLE
+
+class PendingTile:
+    """A tile of a decoded tileset image, cut out and converted for the display only by convert()"""
+    __slots__ = ('image', 'rect', 'flags', 'colorkey', 'pixelalpha')
+
+    def __init__(self, image, rect, flags, colorkey, pixelalpha):
+        self.image = image
+        self.rect = rect
+        self.flags = flags
+        self.colorkey = colorkey
+        self.pixelalpha = pixelalpha
+
+    def convert(self):
+        """The finished tile surface, as pytmx's own pygame loader would make it (main thread only)"""
+        tile = self.image.subsurface(self.rect) if self.rect else self.image.copy()
+        if self.flags:
+            tile = handle_transformation(tile, self.flags)
+        return smart_convert(tile, self.colorkey, self.pixelalpha)
+
+def decode_image_loader(filename, colorkey, **kwargs):
+    """pytmx image loader that only decodes tileset files, leaving every display-format surface to the main thread"""
+    if colorkey:
+        colorkey = pygame.Color(f"#{colorkey}")
+    pixelalpha = kwargs.get('pixelalpha', True)
+    image = pygame.image.load(filename)  # Plain decode into memory, no display involved
+
+    def load_tile(rect=None, flags=None):
+        return PendingTile(image, rect, flags, colorkey, pixelalpha)
+    return load_tile
+
+class MapFile:
+    """A parsed TMX map with decoded tileset images and its nav grid
+
+    Only touches files and plain memory, so it can be built on a worker
+    thread. Converting surfaces for the display (MapData) stays on the main
+    thread, where SDL expects it.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.tmx_data = pytmx.TiledMap(path, image_loader=decode_image_loader)
+        
+        # Map dimensions for boundary
+        self.width = self.tmx_data.width * TILESIZE
+        self.height = self.tmx_data.height * TILESIZE
+        self.map_rect = pygame.Rect(0, 0, self.width, self.height)
+        
+        # Blocked-tile mask for batched steering and horde movement (needs NumPy), from the
+        # rects the obstacle and interactable sprites will have once MapData builds them
+        self.nav_grid = None
+        if NUMPY_AVAILABLE:
+            obstacle_rects = []
+            for layer in self.tmx_data.visible_layers:
+                if isinstance(layer, pytmx.TiledObjectGroup):
+                    for obj in layer:
+                        if obj.image and not obj.properties.get('spawn_zone', False):
+                            obstacle_rects.append(pygame.Rect((obj.x, obj.y), (int(obj.width), int(obj.height))))
+            self.nav_grid = NavGrid(self.map_rect, obstacle_rects)
+
+class MapData:
+    """Everything built from one TMX map, reusable across map changes and restarts (main thread only)"""
+    def __init__(self, map_file):
+        tmx_data = map_file.tmx_data
+        self.path = map_file.path
+        self.width = map_file.width
+        self.height = map_file.height
+        self.map_rect = map_file.map_rect
+        self.nav_grid = map_file.nav_grid
+        
+        # Cut and convert every tile the map uses
+        for gid, image in enumerate(tmx_data.images):
+            if image:
+                tmx_data.images[gid] = image.convert()
+        
+        self.ground_layer = GroundLayer(self.width, self.height)  # Ground tiles (no Y-sort)
+        self.sprites = []  # (sprite, role) in build order; role is 'decoration', 'obstacle' or 'interactable'
+        zone_objects = []  # Rectangle objects marked spawn_zone, turned into SpawnZones below
+        
+        # Render all layers
+        for layer in tmx_data.visible_layers:
+            if isinstance(layer, pytmx.TiledTileLayer):
+                for x, y, gid in layer:
+                    tile = tmx_data.get_tile_image_by_gid(gid)
+                    if tile:
+                        # Check if layer is Decoration layer for Y-sorting
+                        if layer.name == 'Decoration':
+                            self.sprites.append((Tile((x * TILESIZE, y * TILESIZE), [], tile), 'decoration'))
+                        else:
+                            self.ground_layer.add_tile((x * TILESIZE, y * TILESIZE), tile)
+            elif isinstance(layer, pytmx.TiledObjectGroup):
+                for obj in layer:
+                    if obj.properties.get('spawn_zone', False):
+                        zone_objects.append(obj)
+                    elif obj.image:
+                        scaled_image = pygame.transform.scale(obj.image, (int(obj.width), int(obj.height)))
+                        # Check if object is interactable via custom properties
+                        is_interactable = obj.properties.get('interactable', False)
+                        if is_interactable:
+                            # Create interactable object
+                            interactable = InteractableObject(
+                                (obj.x, obj.y), 
+                                [],
+                                scaled_image,
+                                obj.properties.get('name', 'Object'),
+                                obj.properties.get('message', 'An interactable object.')
+                            )
+                            self.sprites.append((interactable, 'interactable'))
+                        else:
+                            # Regular obstacle
+                            self.sprites.append((Tile((obj.x, obj.y), [], scaled_image), 'obstacle'))
+        
+        # Obstacle index in the same order the obstacles join the level's group
+        self.obstacle_grid = build_obstacle_grid(sprite for sprite, role in self.sprites if role != 'decoration')
+        
+        # Where goblins can appear: anywhere walkable, or only inside the map's spawn zones if it has any
+        self.spawn_points = find_spawn_points(self.map_rect.inflate(-2 * SPAWN_EDGE_MARGIN, -2 * SPAWN_EDGE_MARGIN), self.obstacle_grid)
+        self.spawn_zones = []
+        for obj in zone_objects:
+            rect = pygame.Rect(obj.x, obj.y, obj.width, obj.height).clip(self.map_rect)
+            self.spawn_zones.append(SpawnZone(obj.name or 'Spawn zone', rect, int(obj.properties.get('wave_size', 1)),
+                                              find_spawn_points(rect, self.obstacle_grid)))
+        
+        # Static draw order: Y-sorted, ties in build order
+        self.draw_index = SpatialGrid(CHUNK_SIZE)
+        build_order = {sprite: i for i, (sprite, role) in enumerate(self.sprites)}
+        for sprite in sorted(build_order, key=lambda sprite: (sprite.rect.bottom, build_order[sprite])):
+            self.draw_index.insert(sprite, sprite.rect)
+
+class MapCache:
+    """Parsed and built maps kept for the lifetime of the process"""
+    def __init__(self, maps_path=os.path.join('assets', 'maps')):
+        self.maps_path = maps_path
+        self.maps = {}  # map file name -> MapData
+        self.files = {}  # map file name -> MapFile parsed by preload() and not yet built
+        self.lock = threading.Lock()  # Held while parsing so a preload and a get never parse twice
+
+    def preload(self, map_name):
+        """Parse a map and decode its images ahead of get() (safe on a worker thread)"""
+        with self.lock:
+            if map_name not in self.maps and map_name not in self.files:
+                self.files[map_name] = MapFile(os.path.join(self.maps_path, map_name))
+
+    def get(self, map_name):
+        """Return the built map, parsing the TMX only on first use (main thread; waits for a preload in progress)"""
+        map_data = self.maps.get(map_name)
+        if map_data is not None:
+            return map_data
+        with self.lock:
+            map_file = self.files.pop(map_name, None) or MapFile(os.path.join(self.maps_path, map_name))
+            self.maps[map_name] = MapData(map_file)
+            return self.maps[map_name]
+
+    def clear(self):
+        with self.lock:
+            self.maps.clear()
+            self.files.clear()
+
+# Shared by every Level so restarts reuse the same maps
+map_cache = MapCache()
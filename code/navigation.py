@@ -0,0 +1,172 @@
+import math
+from code.settings import *
+
+try:
+    import numpy as np
+except ImportError:  # Steering and horde mode are optional; everything else runs without NumPy
+    np = None
+
+NUMPY_AVAILABLE = np is not None
+
+class NavGrid:
+    """Walkable/blocked tile mask of a map, built from its obstacle rects (needs NumPy)"""
+    def __init__(self, map_rect, obstacle_rects, tile_size=TILESIZE):
+        self.tile_size = tile_size
+        self.columns = math.ceil(map_rect.width / tile_size)
+        self.rows = math.ceil(map_rect.height / tile_size)
+        self.blocked = np.zeros((self.rows, self.columns), dtype=bool)
+        for rect in obstacle_rects:
+            rect = rect.clip(map_rect)
+            if rect.width and rect.height:
+                self.blocked[rect.top // tile_size:(rect.bottom - 1) // tile_size + 1,
+                             rect.left // tile_size:(rect.right - 1) // tile_size + 1] = True
+        
+        # Summed-area table of blocked tiles: any box query is four lookups
+        self.blocked_sums = np.zeros((self.rows + 1, self.columns + 1), dtype=np.int32)
+        self.blocked_sums[1:, 1:] = self.blocked.cumsum(0).cumsum(1)
+
+    def tiles(self, xs, ys):
+        """Column and row arrays of the tiles under world positions, clamped to the map"""
+        columns = np.clip((xs // self.tile_size).astype(np.intp), 0, self.columns - 1)
+        rows = np.clip((ys // self.tile_size).astype(np.intp), 0, self.rows - 1)
+        return columns, rows
+
+    def clamp(self, point):
+        """A world position moved inside the map"""
+        limit_x = self.columns * self.tile_size - 1
+        limit_y = self.rows * self.tile_size - 1
+        return min(max(point[0], 0), limit_x), min(max(point[1], 0), limit_y)
+
+    def tile_at(self, x, y):
+        """(column, row) of the tile under one world position, clamped to the map"""
+        column = min(max(int(x // self.tile_size), 0), self.columns - 1)
+        row = min(max(int(y // self.tile_size), 0), self.rows - 1)
+        return column, row
+
+    def boxes_blocked(self, lefts, tops, width, height):
+        """For each width x height box, whether any tile it overlaps is blocked"""
+        first_columns, first_rows = self.tiles(lefts, tops)
+        last_columns, last_rows = self.tiles(lefts + (width - 1), tops + (height - 1))
+        sums = self.blocked_sums
+        return (sums[last_rows + 1, last_columns + 1] - sums[first_rows, last_columns + 1]
+                - sums[last_rows + 1, first_columns] + sums[first_rows, first_columns]) > 0
+
+# Unit steps to the 8 neighbouring tiles as (column, row) offsets
+NEIGHBOR_STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+UNREACHED = 2 ** 31 - 1  # Distance of tiles the search never got to
+
+class FlowField:
+    """Per-tile directions toward a target over a NavGrid, shared by every enemy of one body size
+
+    A breadth-first search spreads outward from the target's tile over the
+    tiles the body fits on, then each tile points at its lowest-distance
+    neighbour. Tiles with a clear straight line to the target get no
+    direction, so enemies there walk straight at it. The search only reruns
+    when the target moves to another tile; in between, enemies just read
+    their tile's direction.
+    """
+    def __init__(self, nav, body_size):
+        self.nav = nav
+        self.target_tile = None
+        self.recomputes = 0
+        self.distance = np.full((nav.rows, nav.columns), UNREACHED, dtype=np.int32)
+        self.directions = np.zeros((nav.rows, nav.columns, 2))
+
+        # A tile is walkable if the body, centred on it, fits give or take a quarter tile
+        size = nav.tile_size
+        width = max(1, body_size[0] - size // 2)
+        height = max(1, body_size[1] - size // 2)
+        centers_x = (np.arange(nav.columns) + 0.5) * size
+        centers_y = (np.arange(nav.rows) + 0.5) * size
+        lefts, tops = np.meshgrid(centers_x - width / 2, centers_y - height / 2)
+        self.walkable = ~nav.boxes_blocked(lefts, tops, width, height)
+        self.passable = self.walkable.copy()  # walkable plus the free tiles around the current target
+        self.centers = np.stack(np.meshgrid(centers_x, centers_y), axis=-1)
+
+    def update(self, target):
+        """Re-run the search if the target has moved to another tile; returns whether it did"""
+        target = self.nav.clamp(target)
+        tile = self.nav.tile_at(*target)
+        if tile == self.target_tile:
+            return False
+        self.target_tile = tile
+        self.recomputes += 1
+        self.search(*tile)
+        self.point_downhill()
+        self.clear_in_sight(target)
+        return True
+
+    def search(self, column, row):
+        """Breadth-first distances (in 4-connected steps) from the target tile, one frontier wave at a time"""
+        # Tiles next to the target count as walkable if they are free at all: the body only has to reach it
+        passable = self.passable
+        passable[:] = self.walkable
+        around = (slice(max(row - 1, 0), row + 2), slice(max(column - 1, 0), column + 2))
+        passable[around] |= ~self.nav.blocked[around]
+        passable[row, column] = True
+        
+        distance = self.distance
+        distance.fill(UNREACHED)
+        distance[row, column] = 0
+        frontier = np.zeros_like(self.walkable)
+        frontier[row, column] = True
+        grown = np.empty_like(frontier)
+        steps = 0
+        while frontier.any():
+            steps += 1
+            grown.fill(False)
+            grown[1:] |= frontier[:-1]
+            grown[:-1] |= frontier[1:]
+            grown[:, 1:] |= frontier[:, :-1]
+            grown[:, :-1] |= frontier[:, 1:]
+            frontier = grown & passable & (distance == UNREACHED)
+            distance[frontier] = steps
+
+    def point_downhill(self):
+        """Point every tile at its closest-to-target neighbour; diagonals may not cut corners"""
+        rows, columns = self.distance.shape
+        padded = np.full((rows + 2, columns + 2), UNREACHED, dtype=np.int32)
+        padded[1:-1, 1:-1] = self.distance
+
+        def neighbour(dx, dy):
+            return padded[1 + dy:rows + 1 + dy, 1 + dx:columns + 1 + dx]
+
+        candidates = []
+        for dx, dy in NEIGHBOR_STEPS:
+            cost = neighbour(dx, dy)
+            if dx and dy:
+                open_corner = (neighbour(dx, 0) != UNREACHED) & (neighbour(0, dy) != UNREACHED)
+                cost = np.where(open_corner, cost, UNREACHED)
+            candidates.append(cost)
+        candidates = np.stack(candidates)
+        best = candidates.argmin(axis=0)
+        downhill = candidates.min(axis=0) < self.distance
+
+        steps = np.array(NEIGHBOR_STEPS, dtype='f8')
+        steps /= np.hypot(steps[:, 0], steps[:, 1])[:, None]
+        self.directions[:] = 0
+        self.directions[downhill] = steps[best[downhill]]
+
+    def clear_in_sight(self, target):
+        """Drop the direction of reached tiles whose straight line to the target only crosses passable tiles"""
+        reached = np.flatnonzero(self.distance.ravel() != UNREACHED)
+        starts = self.centers.reshape(-1, 2)[reached] * (1 / self.nav.tile_size)  # In tile units from here on
+        delta = np.asarray(target, dtype='f8') * (1 / self.nav.tile_size) - starts
+        # Probe every half tile along the longest line; shorter lines get denser probes
+        samples = max(2, int(np.abs(delta).max() * 2) + 1)
+        fractions = np.linspace(0, 1, samples)
+        columns = (starts[:, 0, None] + delta[:, 0, None] * fractions).astype(np.intp)
+        rows = (starts[:, 1, None] + delta[:, 1, None] * fractions).astype(np.intp)
+        in_sight = self.passable.ravel()[rows * self.nav.columns + columns].all(axis=1)
+        self.directions.reshape(-1, 2)[reached[in_sight]] = 0
+
+    def sample(self, x, y):
+        """(dx, dy) to follow at a world position; (0, 0) means head straight for the target"""
+        column, row = self.nav.tile_at(x, y)
+        dx, dy = self.directions[row, column]
+        return float(dx), float(dy)
+
+    def sample_many(self, xs, ys):
+        """Directions to follow for arrays of world positions (zero rows head straight for the target)"""
+        columns, rows = self.nav.tiles(xs, ys)
+        return self.directions[rows, columns]
@@ -1,5 +1,10 @@
 import pygame 
 from code.settings import *
+from code.animation import frame_atlas
+from code.assets import assets
+from code.profiler import profiler
+from code.audio import sfx
+from code.input import ActionState
 import os
 
 class Player(pygame.sprite.Sprite):
@@ -7,54 +12,41 @@ class Player(pygame.sprite.Sprite):
 		super().__init__(groups)
 		# Use relative path from project root
 		assets_path = os.path.join("assets", "Tiny Swords (Free Pack)", "Tiny Swords (Free Pack)", "Units", "Black Units", "Warrior")
-		self.idle_image = pygame.image.load(os.path.join(assets_path, "Warrior_Idle.png")).convert_alpha()
-		self.running_image = pygame.image.load(os.path.join(assets_path, "Warrior_Run.png")).convert_alpha()
-		self.attack_image = pygame.image.load(os.path.join(assets_path, "Warrior_Attack1.png")).convert_alpha()
+		self.idle_image = assets.image(os.path.join(assets_path, "Warrior_Idle.png"))
+		self.running_image = assets.image(os.path.join(assets_path, "Warrior_Run.png"))
+		self.attack_image = assets.image(os.path.join(assets_path, "Warrior_Attack1.png"))
 		self.sheet_width, self.sheet_height = self.idle_image.get_size()
 		self.frame_width = self.sheet_width // 8
 		self.frame_height = self.sheet_height // 1
 
-		# Load sound effects
-		self.attack_sound = None
-		self.level_up_sound = None
-		try:
-			audio_path = os.path.join("audio", "sword_slash.mp3")
-			if os.path.exists(audio_path):
-				self.attack_sound = pygame.mixer.Sound(audio_path)
-				self.attack_sound.set_volume(0.5)
-				print(f"Loaded sword_slash sound from {audio_path}")
-			else:
-				print(f"Sound file not found: {audio_path}")
-		except Exception as e:
-			print(f"Warning: Could not load sword_slash sound: {e}")
-		
-		try:
-			level_up_audio = os.path.join("audio", "level_up.mp3")
-			if os.path.exists(level_up_audio):
-				self.level_up_sound = pygame.mixer.Sound(level_up_audio)
-				self.level_up_sound.set_volume(0.6)
-				print(f"Loaded level_up sound from {level_up_audio}")
-			else:
-				print(f"Sound file not found: {level_up_audio}")
-		except Exception as e:
-			print(f"Warning: Could not load level_up sound: {e}")
 
 		self.current_frame = 0
 		self.current_row = 0
 		self.is_moving = False
-		temp_image = self.idle_image.subsurface(pygame.Rect(
-			(self.current_frame * self.frame_width)+self.frame_width//8,
+
+		# Frames are sliced, scaled and flipped once and shared by every Player
+		frame_rects = [pygame.Rect(
+			(frame * self.frame_width)+self.frame_width//8,
 			(self.current_row * self.frame_height)+self.frame_height//8,
 			self.frame_width*3//4,
 			self.frame_height*3//4
-		))
-		self.image = pygame.transform.scale(temp_image, (96, 96))
+		) for frame in range(8)]
+		self.animations = {
+			'idle': frame_atlas.strip(os.path.join(assets_path, "Warrior_Idle.png"), 'idle', self.idle_image, frame_rects, (96, 96)),
+			'attack': frame_atlas.strip(os.path.join(assets_path, "Warrior_Attack1.png"), 'attack', self.attack_image, frame_rects[:4], (96, 96)),
+		}
+		self.image = self.animations['idle']['right'][self.current_frame]
 		self.rect = self.image.get_rect(topleft = pos)
 		self.hitbox = self.rect.inflate(-20, -60)
-		self.anim_interval = 0
+		self.anim_timer = 0
 
+		# Movement speeds in pixels per second
 		self.direction = pygame.math.Vector2()
-		self.speed = 3
+		self.base_speed = 180
+		self.speed = self.base_speed
+		self.attack_slowdown = 120
+		self.dodge_boost = 300
+		self.dodge_decay = 720  # speed lost per second while dodging
 		self.orientation = 'right'
 
 		self.attack_anim = False
@@ -77,77 +69,97 @@ class Player(pygame.sprite.Sprite):
 		self.exp = 0
 		self.exp_to_next_level = 50
 		
-		# Invincibility frames
+		# Invincibility time in seconds
 		self.invincibility_timer = 0
-		self.invincibility_duration = 30
+		self.invincibility_duration = 0.5
 
 		self.dodging = False
 
+		# Callbacks run whenever health, stamina, exp or level change (the HUD redraws only then)
+		self.stats_changed = []
+
+		# This tick's input snapshot, set by Level before every update
+		self.actions = ActionState()
+
 	def input(self):
-		keys = pygame.key.get_pressed()
+		actions = self.actions
 		
 		self.direction.x = 0
 		self.direction.y = 0
 
-		if (keys[pygame.K_UP] and not keys[pygame.K_DOWN]) or (keys[pygame.K_w] and not keys[pygame.K_s]):
+		if actions.held('up') and not actions.held('down'):
 			self.direction.y = -1
-		elif (keys[pygame.K_DOWN] and not keys[pygame.K_UP]) or (keys[pygame.K_s] and not keys[pygame.K_w]):
+		elif actions.held('down') and not actions.held('up'):
 			self.direction.y = 1
-		if (keys[pygame.K_LEFT] and not keys[pygame.K_RIGHT]) or (keys[pygame.K_a] and not keys[pygame.K_d]):
+		if actions.held('left') and not actions.held('right'):
 			self.direction.x = -1
 			if self.orientation != 'left':
 				self.orientation = 'left'
-		elif (keys[pygame.K_RIGHT] and not keys[pygame.K_LEFT]) or (keys[pygame.K_d] and not keys[pygame.K_a]):
+		elif actions.held('right') and not actions.held('left'):
 			self.direction.x = 1
 			if self.orientation != 'right':
 				self.orientation = 'right'
 
-	def move(self, boundary_rect):
+		# Attack and dodge fire once per press, not every tick the button is held
+		if actions.pressed('attack'):
+			self.attack()
+		if actions.pressed('dodge'):
+			self.dodge()
+
+	def move(self, boundary_rect, dt):
 		if self.direction.length_squared() > 0:
 			if self.direction.length() != 0:
 				self.direction = self.direction.normalize()
 
-			new_x = self.hitbox.x + self.direction.x * self.speed
-			new_y = self.hitbox.y + self.direction.y * self.speed
+			new_x = self.hitbox.x + self.direction.x * self.speed * dt
+			new_y = self.hitbox.y + self.direction.y * self.speed * dt
 
 			# Keep player within map boundaries
 			new_x = max(boundary_rect.left, min(new_x, boundary_rect.right - self.hitbox.width))
 			new_y = max(boundary_rect.top, min(new_y, boundary_rect.bottom - self.hitbox.height))
 
-			self.hitbox.x = new_x
-			self.collide('horizontal')
-			self.hitbox.y = new_y
-			self.collide('vertical')
+			with profiler.section('collision'):
+				# Only test obstacles near the area swept by this move
+				target = pygame.Rect(new_x, new_y, self.hitbox.width, self.hitbox.height)
+				nearby = self.obstacle_sprites.near(self.hitbox.union(target))
+
+				self.hitbox.x = new_x
+				self.collide('horizontal', nearby)
+				self.hitbox.y = new_y
+				self.collide('vertical', nearby)
 			self.rect.center = self.hitbox.center
 
 	def dodge(self):
 		if self.dodging == False:
 			if self.stamina >= 20:
 				self.dodging = True
-				self.speed += 5
+				self.speed += self.dodge_boost
 				self.stamina -= 20
+				self.notify_stats_changed()
 
 	def attack(self):
 		if self.attack_anim == False and self.stamina >= 10:
-			self.speed -= 2
+			self.speed -= self.attack_slowdown
 			self.attack_anim = True
 			self.attack_frame = 4
 			self.current_frame = 0
 			self.stamina -= 10
-			# Play attack sound
-			if self.attack_sound:
-				self.attack_sound.play()
+			self.notify_stats_changed()
+			# Play attack sound (player sounds have reserved channels)
+			sfx.play('sword_slash')
 
-	def collide(self, direction):
+	def collide(self, direction, obstacles=None):
+		if obstacles is None:
+			obstacles = self.obstacle_sprites
 		if direction == 'horizontal':
-			for sprite in self.obstacle_sprites:
+			for sprite in obstacles:
 				if sprite.hitbox.colliderect(self.hitbox):
 					if self.direction.x > 0: # moving right
 						self.hitbox.right = sprite.hitbox.left
 					if self.direction.x < 0: # moving left
 						self.hitbox.left = sprite.hitbox.right
 		if direction == 'vertical':
-			for sprite in self.obstacle_sprites:
+			for sprite in obstacles:
 				if sprite.hitbox.colliderect(self.hitbox):
 					if self.direction.y > 0: # moving down
 						self.hitbox.bottom = sprite.hitbox.top
@@ -159,7 +171,7 @@ class Player(pygame.sprite.Sprite):
 			self.attack_frame -= 1
 			if self.attack_frame <= 0:
 				self.attack_anim = False
-				self.speed += 2
+				self.speed += self.attack_slowdown
 				self.delete_attack_hitbox()  # Remove attack hitbox when attack ends
 			self.current_frame = (self.current_frame + 1) % 4
 			self.update_sprite()
@@ -167,37 +179,19 @@ class Player(pygame.sprite.Sprite):
 			self.current_frame = (self.current_frame + 1) % 8
 			self.update_sprite()
 
-		self.stamina = min(self.stamina + 0.5, self.max_stamina)
+		if self.stamina < self.max_stamina:
+			self.stamina = min(self.stamina + 0.5, self.max_stamina)
+			self.notify_stats_changed()
 
 	def update_sprite(self):
 		if self.attack_anim:
-			src_rect = pygame.Rect(
-				(self.current_frame * self.frame_width)+self.frame_width//8,
-				(self.current_row * self.frame_height)+self.frame_height//8,
-				self.frame_width*3//4,
-				self.frame_height*3//4
-			)
-			temp_image = self.attack_image.subsurface(src_rect)
-			temp_image = pygame.transform.scale(temp_image, (96, 96))
-			if self.orientation == 'left':
-				temp_image = pygame.transform.flip(temp_image, True, False)
-			self.image = temp_image
+			self.image = self.animations['attack'][self.orientation][self.current_frame]
 			# Only create hitbox on second to last frame (frame 2 out of 0,1,2,3)
 			if self.current_frame == 2:
 				self.create_attack_hitbox()
 			return
 		else:
-			src_rect = pygame.Rect(
-				(self.current_frame * self.frame_width)+self.frame_width//8,
-				(self.current_row * self.frame_height)+self.frame_height//8,
-				self.frame_width*3//4,
-				self.frame_height*3//4
-			)
-			temp_image = self.idle_image.subsurface(src_rect)
-			temp_image = pygame.transform.scale(temp_image, (96, 96))
-			if self.orientation == 'left':
-				temp_image = pygame.transform.flip(temp_image, True, False)
-			self.image = temp_image
+			self.image = self.animations['idle'][self.orientation][self.current_frame]
 			self.delete_attack_hitbox()
 	
 	def gain_exp(self, amount):
@@ -207,6 +201,7 @@ class Player(pygame.sprite.Sprite):
 		# Check for level up
 		while self.exp >= self.exp_to_next_level:
 			self.level_up()
+		self.notify_stats_changed()
 	
 	def level_up(self):
 		"""Level up and increase stats"""
@@ -214,8 +209,7 @@ class Player(pygame.sprite.Sprite):
 		self.level += 1
 		
 		# Play level up sound
-		if self.level_up_sound:
-			self.level_up_sound.play()
+		sfx.play('level_up')
 		
 		# Increase exp requirement for next level
 		# Formula: base (50) + (level * 10)
@@ -228,23 +222,28 @@ class Player(pygame.sprite.Sprite):
 		self.stamina = self.max_stamina
 		self.attack_power += 2
 		self.defense += 1
+		self.notify_stats_changed()
+
+	def notify_stats_changed(self):
+		for callback in self.stats_changed:
+			callback()
 
-	def update(self, boundary_rect):
+	def update(self, boundary_rect, dt):
 		self.input()
-		self.move(boundary_rect)
-		if self.anim_interval < 1:
-			self.anim_interval += 0.1
-		if self.anim_interval >= 1:
-			self.anim_interval = 0
-			self.animate()
+		self.move(boundary_rect, dt)
+		self.anim_timer += dt
+		if self.anim_timer >= ANIMATION_FRAME_TIME:
+			self.anim_timer -= ANIMATION_FRAME_TIME
+			with profiler.section('animation'):
+				self.animate()
 		
 		# Update invincibility timer
 		if self.invincibility_timer > 0:
-			self.invincibility_timer -= 1
+			self.invincibility_timer -= dt
 		if self.dodging:
-			self.speed -= 0.2
-			if self.speed <= 3:
-				self.speed = 3
+			self.speed -= self.dodge_decay * dt
+			if self.speed <= self.base_speed:
+				self.speed = self.base_speed
 				self.dodging = False
 	
 	def take_damage(self, damage):
@@ -254,6 +253,7 @@ class Player(pygame.sprite.Sprite):
 			if self.health < 0:
 				self.health = 0
 			self.invincibility_timer = self.invincibility_duration
+			self.notify_stats_changed()
 
 	def draw(self, surface):
 		surface.blit(self.image, self.rect.topleft)
@@ -267,15 +267,3 @@ class Player(pygame.sprite.Sprite):
 	
 	def draw(self, surface):
 		surface.blit(self.image, self.rect.topleft)
-
-class AttackHitbox(pygame.sprite.Sprite):
-	def __init__(self, player, groups):
-		super().__init__(groups)
-		orientation = player.orientation
-		self.image = pygame.Surface((96, 96), pygame.SRCALPHA)
-		# Completely transparent - no visible color
-		self.image.fill((0, 0, 0, 0))
-		if orientation == 'right':
-			self.rect = self.image.get_rect(center = (player.rect.right, player.rect.centery - 10))
-		else:
-			self.rect = self.image.get_rect(center = (player.rect.left, player.rect.centery - 10))
\ No newline at end of file
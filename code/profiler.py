@@ -0,0 +1,112 @@
+import os
+import csv
+import math
+import time
+from collections import deque
+
+
+class ProfileSection:
+    """Context manager that adds its elapsed time to a profiler phase"""
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class NullSection:
+    """Shared no-op section used while profiling is disabled"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SECTION = NullSection()
+
+
+class Profiler:
+    """Accumulates per-tick timings for named phases of the game loop"""
+    def __init__(self, window=300):
+        self.enabled = os.environ.get('PROJECT_M_PROFILE', '') not in ('', '0')
+        self.window = window  # Ticks kept per phase (None keeps every tick)
+        self.current = {}  # phase -> seconds spent during the current tick
+        self.history = {}  # phase -> rolling per-tick seconds
+        self.counters = {}  # name -> latest value of a non-timing metric (voices, cache hits, ...)
+        self.ticks = 0
+
+    def count(self, name, value):
+        """Report the current value of a counter; the overlay and benchmark show the latest one"""
+        self.counters[name] = value
+
+    def section(self, name):
+        if not self.enabled:
+            return NULL_SECTION
+        return ProfileSection(self, name)
+
+    def add(self, name, seconds):
+        self.current[name] = self.current.get(name, 0.0) + seconds
+
+    def end_tick(self):
+        """Close the current tick; phases that did not run record zero"""
+        if not self.enabled:
+            return
+        for name in self.current:
+            if name not in self.history:
+                recorded = self.ticks if self.window is None else min(self.ticks, self.window)
+                self.history[name] = deque([0.0] * recorded, maxlen=self.window)
+        for name, samples in self.history.items():
+            samples.append(self.current.get(name, 0.0))
+        self.current = {}
+        self.ticks += 1
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.current = {}
+
+    def reset(self, window=300):
+        self.window = window
+        self.current = {}
+        self.history = {}
+        self.counters = {}
+        self.ticks = 0
+
+    def percentiles(self, name, fractions=(0.50, 0.95, 0.99)):
+        """Rolling percentiles of a phase in milliseconds"""
+        samples = self.history.get(name, ())
+        return [percentile(samples, fraction) * 1000 for fraction in fractions]
+
+    def dump_csv(self, path):
+        """Write the recorded ticks as one row per tick, one column per phase"""
+        names = sorted(self.history)
+        rows = zip(*(self.history[name] for name in names))
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['tick'] + [f'{name}_ms' for name in names])
+            first_tick = self.ticks - len(self.history[names[0]]) if names else 0
+            for index, row in enumerate(rows):
+                writer.writerow([first_tick + index] + [f'{seconds * 1000:.4f}' for seconds in row])
+        return path
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+# Shared by the game loop and every instrumented subsystem
+profiler = Profiler()
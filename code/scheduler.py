@@ -0,0 +1,55 @@
+from code.settings import *
+from code.profiler import profiler
+
+class AIScheduler:
+    """Level of detail for enemy updates
+
+    Enemies in (or just outside) the camera view update every tick. The rest
+    are split into `interval` groups that take turns, one group per tick; each
+    update catches up on all the time the enemy skipped, and unseen enemies
+    don't cycle idle animation frames. An enemy that comes into view is back
+    at full rate on the next tick.
+    """
+    def __init__(self, interval=AI_LOD_INTERVAL, margin=AI_LOD_MARGIN):
+        self.interval = interval
+        self.margin = margin
+        self.tick = 0
+        self.owed = {}  # enemy -> seconds of simulation skipped since its last update
+        self.slots = {}  # enemy -> tick (mod interval) it runs on while off-screen
+        self.next_slot = 0
+        self.full_rate = 0  # Enemies updated at full rate during the last tick
+        self.throttled = 0  # Off-screen enemies during the last tick (updated or not)
+
+    def update(self, enemies, view, boundary_rect, dt):
+        """Update each enemy that is due this tick; view is the camera's world rect"""
+        near = view.inflate(self.margin * 2, self.margin * 2)
+        turn = self.tick % self.interval
+        self.tick += 1
+        self.full_rate = 0
+        self.throttled = 0
+        for enemy in enemies:
+            elapsed = self.owed.pop(enemy, 0.0) + dt
+            if enemy.rect.colliderect(near):
+                self.full_rate += 1
+                enemy.update(boundary_rect, elapsed)
+                continue
+            self.throttled += 1
+            slot = self.slots.get(enemy)
+            if slot is None:
+                # Spread enemies over the turns in the order they are first seen off-screen
+                slot = self.slots[enemy] = self.next_slot
+                self.next_slot = (self.next_slot + 1) % self.interval
+            if slot == turn:
+                enemy.update(boundary_rect, elapsed, animate=False)
+            else:
+                self.owed[enemy] = elapsed
+        profiler.count('ai full rate', self.full_rate)
+        profiler.count('ai throttled', self.throttled)
+
+    def forget(self, enemy):
+        self.owed.pop(enemy, None)
+        self.slots.pop(enemy, None)
+
+    def clear(self):
+        self.owed.clear()
+        self.slots.clear()
@@ -1,8 +1,15 @@
 # game setup
 WIDTH, HEIGHT = 1280, 720
-FPS = 60
+FPS = 144  # render cap; the simulation always steps at TICK_RATE
 TILESIZE = 64
 
+# simulation timing
+TICK_RATE = 60
+TICK_TIME = 1 / TICK_RATE
+MAX_FRAME_TIME = 0.25  # longest stall the simulation catches up on
+MENU_IDLE_TIMEOUT = 100  # ms a menu sleeps waiting for input before checking on the music
+ANIMATION_FRAME_TIME = 0.18  # seconds per animation frame
+
 WORLD_MAP = [
 ['x','x','x','x','x','x','x','x','x','x','x','x','x','x','x','x','x','x','x','x'],
 ['x',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ','x'],
@@ -24,4 +31,19 @@ WORLD_MAP = [
 ['x',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ','x'],
 ['x',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ',' ','x'],
 ['x','x','x','x','x','x','x','x','x','x','x','x','x','x','x','x','x','x','x','x'],
-]
\ No newline at end of file
+]
+
+# rendering
+CHUNK_SIZE = TILESIZE * 8
+
+# collision
+COLLISION_CELL_SIZE = TILESIZE * 2
+
+# enemy spawning
+SPAWN_CLEARANCE = (118, 98)  # goblin hitbox size a spawn point must fit
+SPAWN_EDGE_MARGIN = 200  # spawn points stay this far inside the map edge (outside spawn zones)
+SPAWN_MIN_DISTANCE = 300  # goblins never spawn closer than this to the player
+
+# enemy AI level of detail
+AI_LOD_INTERVAL = 4  # off-screen enemies update once every this many ticks
+AI_LOD_MARGIN = TILESIZE * 2  # how far outside the camera view enemies still update every tick
@@ -0,0 +1,134 @@
+import pygame
+from code.settings import *
+
+class SpatialGrid:
+    """Uniform grid that buckets items by the cells their bounds overlap"""
+    def __init__(self, cell_size=COLLISION_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # (column, row) -> list of (order, item)
+        self.count = 0
+
+    def cell_range(self, rect):
+        left = min(rect.left, rect.right) // self.cell_size
+        right = (max(rect.left, rect.right) - 1) // self.cell_size
+        top = min(rect.top, rect.bottom) // self.cell_size
+        bottom = (max(rect.top, rect.bottom) - 1) // self.cell_size
+        return range(left, max(left, right) + 1), range(top, max(top, bottom) + 1)
+
+    def insert(self, item, rect):
+        """Add an item; query results keep insertion order"""
+        columns, rows = self.cell_range(rect)
+        entry = (self.count, item)
+        self.count += 1
+        for col in columns:
+            for row in rows:
+                self.cells.setdefault((col, row), []).append(entry)
+
+    def query(self, rect):
+        """Return the items in every cell overlapping rect, in insertion order"""
+        columns, rows = self.cell_range(rect)
+        found = {}
+        for col in columns:
+            for row in rows:
+                bucket = self.cells.get((col, row))
+                if bucket:
+                    for order, item in bucket:
+                        found[order] = item
+        return [found[order] for order in sorted(found)]
+
+    def clear(self):
+        self.cells.clear()
+        self.count = 0
+
+class DynamicGrid:
+    """Spatial grid for moving items that re-buckets an item only when it crosses a cell boundary"""
+    def __init__(self, cell_size=COLLISION_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # (column, row) -> {item: None}
+        self.bounds = {}  # item -> (left, top, right, bottom) cell bounds it is bucketed under
+        self.order = {}  # item -> insertion sequence, so queries keep insertion order
+        self.count = 0
+
+    def move(self, item, rect):
+        """Insert an item or update it for its new rect (a no-op unless it changed cells)"""
+        size = self.cell_size
+        bounds = (rect.left // size, rect.top // size, (rect.right - 1) // size, (rect.bottom - 1) // size)
+        previous = self.bounds.get(item)
+        if previous == bounds:
+            return
+        if previous is None:
+            self.order[item] = self.count
+            self.count += 1
+        else:
+            self.unlink(item, previous)
+        self.bounds[item] = bounds
+        for col in range(bounds[0], bounds[2] + 1):
+            for row in range(bounds[1], bounds[3] + 1):
+                self.cells.setdefault((col, row), {})[item] = None
+
+    def unlink(self, item, bounds):
+        for col in range(bounds[0], bounds[2] + 1):
+            for row in range(bounds[1], bounds[3] + 1):
+                bucket = self.cells[(col, row)]
+                del bucket[item]
+                if not bucket:
+                    del self.cells[(col, row)]
+
+    def remove(self, item):
+        bounds = self.bounds.pop(item, None)
+        if bounds is not None:
+            self.unlink(item, bounds)
+            del self.order[item]
+
+    def query(self, rect):
+        """Return the items in every cell overlapping rect, in insertion order"""
+        size = self.cell_size
+        found = set()
+        for col in range(rect.left // size, (rect.right - 1) // size + 1):
+            for row in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                bucket = self.cells.get((col, row))
+                if bucket:
+                    found.update(bucket)
+        return sorted(found, key=self.order.__getitem__)
+
+    def clear(self):
+        self.cells.clear()
+        self.bounds.clear()
+        self.order.clear()
+        self.count = 0
+
+def build_obstacle_grid(obstacles):
+    """Bucket every obstacle by the bounds of both its rect and hitbox"""
+    grid = SpatialGrid()
+    for sprite in obstacles:
+        hitbox = sprite.hitbox.copy()
+        hitbox.normalize()
+        grid.insert(sprite, sprite.rect.union(hitbox))
+    return grid
+
+class ObstacleGroup(pygame.sprite.Group):
+    """Sprite group that also keeps a static spatial index of its obstacles"""
+    def __init__(self, *sprites):
+        self.grid = None
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.grid = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.grid = None
+
+    def build_index(self):
+        self.grid = build_obstacle_grid(self.sprites())
+
+    def use_index(self, grid):
+        """Adopt a grid prebuilt for exactly this group's obstacles, in group order"""
+        self.grid = grid
+
+    def near(self, rect):
+        """Obstacles that may overlap rect, in the same order as iterating the group"""
+        if self.grid is None:
+            self.build_index()
+        return self.grid.query(rect)
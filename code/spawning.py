@@ -0,0 +1,54 @@
+import pygame
+import random
+from code.settings import *
+
+class SpawnPoints:
+    """Walkable spawn positions (goblin centres) of a map or zone, drawn at random under constraints"""
+    def __init__(self, points):
+        self.points = points
+
+    def __len__(self):
+        return len(self.points)
+
+    def sample(self, away_from, min_distance, hidden_from=None, attempts=12):
+        """A random point at least min_distance from away_from and outside hidden_from, or None
+
+        A few random draws almost always find one; only when most points are
+        ruled out does it fall back to checking every point once.
+        """
+        def allowed(point):
+            dx = point[0] - away_from[0]
+            dy = point[1] - away_from[1]
+            if dx * dx + dy * dy < min_distance * min_distance:
+                return False
+            return hidden_from is None or not hidden_from.collidepoint(point)
+
+        if not self.points:
+            return None
+        for _ in range(attempts):
+            point = random.choice(self.points)
+            if allowed(point):
+                return point
+        candidates = [point for point in self.points if allowed(point)]
+        return random.choice(candidates) if candidates else None
+
+class SpawnZone:
+    """Rectangle from a TMX object layer that spawns goblins in waves of wave_size"""
+    def __init__(self, name, rect, wave_size, points):
+        self.name = name
+        self.rect = rect
+        self.wave_size = wave_size
+        self.points = points
+
+def find_spawn_points(area, obstacle_grid, clearance=SPAWN_CLEARANCE, step=TILESIZE):
+    """Tile centres inside area where a clearance-sized box overlaps no obstacle rect"""
+    points = []
+    box = pygame.Rect((0, 0), clearance)
+    for y in range(area.top + step // 2, area.bottom, step):
+        for x in range(area.left + step // 2, area.right, step):
+            box.center = (x, y)
+            if not area.contains(box):
+                continue
+            if not any(obstacle.rect.colliderect(box) for obstacle in obstacle_grid.query(box)):
+                points.append((x, y))
+    return SpawnPoints(points)
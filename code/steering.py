@@ -0,0 +1,146 @@
+from code.settings import *
+
+try:
+    import numpy as np
+except ImportError:  # Without NumPy goblins fall back to Goblin.ai_behavior's straight chase
+    np = None
+
+SEPARATION_RADIUS = 80  # Goblins closer than this push each other apart
+SEPARATION_WEIGHT = 1.5
+LOOKAHEAD = 32  # How far ahead (px) obstacle avoidance probes
+AVOID_ANGLES = (45, -45, 90, -90)  # Detours tried, in order, when the way ahead is blocked
+
+# Half of a 3x3 cell neighbourhood: every pair of neighbouring cells is visited once
+FORWARD_CELLS = ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+def neighbor_pairs(points, radius):
+    """Every unordered pair (i, j) of points closer than radius, each reported once
+
+    Points are bucketed into radius-sized cells and sorted by cell key; a
+    table of where each cell starts in that order lets every point find the
+    candidates in the cells ahead of it without a search.
+    Returns (i, j, points[i] - points[j], distance).
+    """
+    n = len(points)
+    cells = (points // radius).astype(np.intp)
+    cells -= cells.min(axis=0)
+    width = int(cells[:, 0].max()) + 3  # One spare column either side so dx=-1/+1 never wraps a row
+    keys = (cells[:, 1] + 1) * width + cells[:, 0] + 1
+    order = np.argsort(keys, kind='stable')
+    cell_starts = np.zeros(int(keys.max()) + width + 3, dtype=np.intp)
+    np.cumsum(np.bincount(keys, minlength=len(cell_starts) - 1), out=cell_starts[1:])
+    rank = np.empty(n, dtype=np.intp)
+    rank[order] = np.arange(n)
+    owners = []
+    others = []
+    for dx, dy in FORWARD_CELLS:
+        probe = keys + dy * width + dx
+        starts = cell_starts[probe]
+        ends = cell_starts[probe + 1]
+        if dx == 0 and dy == 0:
+            starts = rank + 1  # Same cell: only the points sorted after this one
+        counts = ends - starts
+        total = int(counts.sum())
+        if not total:
+            continue
+        # Expand each point's [start, end) range of the sorted order into explicit pairs
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        owners.append(np.repeat(np.arange(n), counts))
+        others.append(order[np.repeat(starts, counts) + offsets])
+    if not owners:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty, np.zeros((0, 2)), np.zeros(0)
+    i = np.concatenate(owners)
+    j = np.concatenate(others)
+    xs = points[:, 0]
+    ys = points[:, 1]
+    diff_x = xs[i] - xs[j]
+    diff_y = ys[i] - ys[j]
+    distance = np.hypot(diff_x, diff_y)
+    close = distance < radius
+    return i[close], j[close], np.stack((diff_x[close], diff_y[close]), axis=1), distance[close]
+
+def separation(points, radius=SEPARATION_RADIUS):
+    """Push away from close neighbours, stronger the closer they are"""
+    n = len(points)
+    if n < 2:
+        return np.zeros_like(points)
+    i, j, diff, distance = neighbor_pairs(points, radius)
+    if not len(i):
+        return np.zeros_like(points)
+    # Exactly overlapping goblins split apart horizontally by index
+    stacked = distance == 0
+    diff[stacked, 0] = np.sign(i[stacked] - j[stacked])
+    distance[stacked] = 1
+    force = diff * ((1 - distance / radius) / distance)[:, None]
+    # Each pair pushes both points, in opposite directions
+    push = np.empty_like(points)
+    for axis in (0, 1):
+        push[:, axis] = np.bincount(i, force[:, axis], n) - np.bincount(j, force[:, axis], n)
+    return push
+
+def rotate(vectors, degrees):
+    angle = np.radians(degrees)
+    cos, sin = np.cos(angle), np.sin(angle)
+    return np.stack((vectors[:, 0] * cos - vectors[:, 1] * sin, vectors[:, 0] * sin + vectors[:, 1] * cos), axis=1)
+
+def normalize(vectors):
+    length = np.hypot(vectors[:, 0], vectors[:, 1])
+    moving = length > 0
+    vectors[moving] /= length[moving, None]
+    return vectors
+
+def avoid_obstacles(direction, lefts_tops, hitbox_size, nav):
+    """Turn directions whose next LOOKAHEAD px run into a blocked tile toward the first free detour"""
+    width, height = hitbox_size
+    moving = np.flatnonzero((direction[:, 0] != 0) | (direction[:, 1] != 0))
+    if not len(moving):
+        return direction
+    origin = lefts_tops[moving]
+    ahead = origin + direction[moving] * LOOKAHEAD
+    # Goblins already overlapping a blocked tile are left to walk out of it
+    blocked = nav.boxes_blocked(ahead[:, 0], ahead[:, 1], width, height) & ~nav.boxes_blocked(origin[:, 0], origin[:, 1], width, height)
+    for angle in AVOID_ANGLES:
+        if not blocked.any():
+            break
+        rows = moving[blocked]
+        detour = rotate(direction[rows], angle)
+        ahead = lefts_tops[rows] + detour * LOOKAHEAD
+        free = ~nav.boxes_blocked(ahead[:, 0], ahead[:, 1], width, height)
+        direction[rows[free]] = detour[free]
+        blocked[np.flatnonzero(blocked)[free]] = False
+    return direction
+
+def steer(centers, target, hitbox_size, chase_radius, nav=None, flow=None):
+    """Seek (along the flow field when given) + separation + obstacle avoidance for a batch of enemies
+
+    Returns (direction, chasing, distance): unit (or zero) move directions,
+    whether each enemy is still outside chase_radius of the target, and its
+    distance to the target. Enemies in range hold still to attack.
+    """
+    to_target = np.asarray(target, dtype='f8') - centers
+    distance = np.hypot(to_target[:, 0], to_target[:, 1])
+    chasing = distance > chase_radius
+    direction = np.zeros_like(centers)
+    direction[chasing] = to_target[chasing] / distance[chasing, None]
+    if flow is not None:
+        # Follow the field around walls; goblins with a clear line keep the direct heading
+        flow_directions = flow.sample_many(centers[:, 0], centers[:, 1])
+        routed = chasing & flow_directions.any(axis=1)
+        direction[routed] = flow_directions[routed]
+    direction += SEPARATION_WEIGHT * separation(centers)
+    direction[~chasing] = 0
+    normalize(direction)
+    if nav is not None:
+        lefts_tops = centers - np.asarray(hitbox_size, dtype='f8') / 2
+        avoid_obstacles(direction, lefts_tops, hitbox_size, nav)
+    return direction, chasing, distance
+
+def steer_sprites(enemies, target, nav=None, flow=None):
+    """Run one batched steering pass for sprite enemies, setting each one's `steering` to (dx, dy, chasing)"""
+    if np is None or not enemies:
+        return
+    centers = np.array([enemy.hitbox.center for enemy in enemies], dtype='f8')
+    direction, chasing, distance = steer(centers, target, enemies[0].hitbox.size, enemies[0].attack_radius, nav, flow)
+    for enemy, (dx, dy), chase in zip(enemies, direction.tolist(), chasing.tolist()):
+        enemy.steering = (dx, dy, chase)
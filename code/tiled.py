@@ -3,8 +3,65 @@ from code.settings import *
 import os
 
 class Tile(pygame.sprite.Sprite):
+    static = True  # Never moves, so the camera can pre-sort it once per map
+
     def __init__(self, pos, groups, image=None):
         super().__init__(groups)
         self.image = image
         self.rect = self.image.get_rect(topleft = pos)
-        self.hitbox = self.rect.inflate(-40, -100)
\ No newline at end of file
+        self.hitbox = self.rect.inflate(-40, -100)
+
+class InteractableObject(pygame.sprite.Sprite):
+    static = True
+    destination = 'boss_field.tmx'  # Map the portal leads to
+    spawn_pos = (500, 500)
+
+    def __init__(self, pos, groups, image, name, message):
+        super().__init__(groups)
+        self.image = image
+        self.rect = self.image.get_rect(topleft=pos)
+        self.hitbox = self.rect.inflate(-100, -100)  # Slightly smaller hitbox for better collision
+        self.name = name
+        self.message = message
+    
+    def interact(self, level, change_map):
+        level.arena = "Boss"
+        change_map(self.destination, self.spawn_pos)
+        level.spawn_boss()
+
+class GroundLayer:
+    """Ground tiles baked once into fixed-size chunk surfaces"""
+    def __init__(self, map_width, map_height, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.map_rect = pygame.Rect(0, 0, map_width, map_height)
+        self.chunks = {}  # (column, row) -> pre-rendered surface
+
+    def add_tile(self, pos, image):
+        """Blit a tile into every chunk it overlaps"""
+        tile_rect = image.get_rect(topleft=pos)
+        first_col = tile_rect.left // self.chunk_size
+        last_col = (tile_rect.right - 1) // self.chunk_size
+        first_row = tile_rect.top // self.chunk_size
+        last_row = (tile_rect.bottom - 1) // self.chunk_size
+        for col in range(first_col, last_col + 1):
+            for row in range(first_row, last_row + 1):
+                chunk = self.chunks.get((col, row))
+                if chunk is None:
+                    # Opaque black matches the cleared screen under transparent tiles
+                    chunk = pygame.Surface((self.chunk_size, self.chunk_size)).convert()
+                    chunk.fill('black')
+                    self.chunks[(col, row)] = chunk
+                chunk.blit(image, (tile_rect.x - col * self.chunk_size, tile_rect.y - row * self.chunk_size))
+
+    def draw(self, surface, offset):
+        """Blit only the chunks overlapping the camera view"""
+        view = pygame.Rect(int(offset.x), int(offset.y), surface.get_width(), surface.get_height())
+        first_col = max(0, view.left // self.chunk_size)
+        last_col = (view.right - 1) // self.chunk_size
+        first_row = max(0, view.top // self.chunk_size)
+        last_row = (view.bottom - 1) // self.chunk_size
+        for col in range(first_col, last_col + 1):
+            for row in range(first_row, last_row + 1):
+                chunk = self.chunks.get((col, row))
+                if chunk:
+                    surface.blit(chunk, (col * self.chunk_size - offset.x, row * self.chunk_size - offset.y))
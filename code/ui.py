@@ -1,28 +1,93 @@
 import pygame
 from code.settings import *
+from code.assets import assets
+from code.profiler import profiler
+from collections import OrderedDict
 import os
 
-class Menu:
+class TextCache:
+    """Rendered text surfaces keyed by (font, string, color, antialias); the least recently used go first
+
+    Surfaces are shared between callers, so blit them but never draw on them.
+    """
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, antialias, color):
+        """Same arguments as font.render, plus the font (color must be hashable, e.g. a tuple)"""
+        key = (font, text, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            profiler.count('text cache hits', self.hits)
+            return surface
+        self.misses += 1
+        profiler.count('text cache misses', self.misses)
+        surface = self.surfaces[key] = font.render(text, antialias, color)
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+# Shared by the HUD and every menu
+text_cache = TextCache()
+
+def frozen_frame(frame, color, alpha):
+    """Copy of a rendered frame with a translucent color laid over it once (backdrop for pause/game over)"""
+    backdrop = frame.copy()
+    overlay = pygame.Surface(backdrop.get_size())
+    overlay.set_alpha(alpha)
+    overlay.fill(color)
+    backdrop.blit(overlay, (0, 0))
+    return backdrop
+
+class MenuScreen:
+    """Option selection shared by the menus, driven one input event at a time
+
+    Keys and clicks act once per press (KEYDOWN / MOUSEBUTTONDOWN), so no
+    debounce delay is needed between them.
+    """
+    def handle_event(self, event):
+        """Apply one input event; returns the index of the chosen option, or None"""
+        if event.type == pygame.MOUSEMOTION:
+            for i, rect in enumerate(self.button_rects):
+                if rect.collidepoint(event.pos):
+                    self.selected = i
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            for i, rect in enumerate(self.button_rects):
+                if rect.collidepoint(event.pos):
+                    self.selected = i
+                    return i
+        elif event.type == pygame.KEYDOWN:
+            if event.key in (pygame.K_UP, pygame.K_w):
+                self.selected = (self.selected - 1) % len(self.options)
+            elif event.key in (pygame.K_DOWN, pygame.K_s):
+                self.selected = (self.selected + 1) % len(self.options)
+            elif event.key in (pygame.K_RETURN, pygame.K_SPACE):
+                return self.selected
+        return None
+
+class Menu(MenuScreen):
     def __init__(self):
         self.display_surface = pygame.display.get_surface()
-        self.font_large = pygame.font.Font(None, 80)
-        self.font_medium = pygame.font.Font(None, 50)
-        self.font_small = pygame.font.Font(None, 30)
+        self.font_large = assets.font(None, 80)
+        self.font_medium = assets.font(None, 50)
+        self.font_small = assets.font(None, 30)
         
         # Load UI assets
         ui_path = os.path.join("assets", "Tiny Swords", "Tiny Swords (Update 010)", "UI")
         try:
-            # Load button sprites
-            self.button_normal = pygame.image.load(os.path.join(ui_path, "Buttons", "Button_Blue.png")).convert_alpha()
-            self.button_hover = pygame.image.load(os.path.join(ui_path, "Buttons", "Button_Hover.png")).convert_alpha()
-            self.button_pressed = pygame.image.load(os.path.join(ui_path, "Buttons", "Button_Blue_Pressed.png")).convert_alpha()
-            
-            # Scale buttons
-            button_width = 300
-            button_height = 80
-            self.button_normal = pygame.transform.scale(self.button_normal, (button_width, button_height))
-            self.button_hover = pygame.transform.scale(self.button_hover, (button_width, button_height))
-            self.button_pressed = pygame.transform.scale(self.button_pressed, (button_width, button_height))
+            # Load scaled button sprites
+            button_size = (300, 80)
+            self.button_normal = assets.image(os.path.join(ui_path, "Buttons", "Button_Blue.png"), button_size)
+            self.button_hover = assets.image(os.path.join(ui_path, "Buttons", "Button_Hover.png"), button_size)
+            self.button_pressed = assets.image(os.path.join(ui_path, "Buttons", "Button_Blue_Pressed.png"), button_size)
             self.has_button_sprites = True
         except:
             self.has_button_sprites = False
@@ -31,7 +96,6 @@ class Menu:
         # Menu options
         self.options = ['Start Game', 'Quit']
         self.selected = 0
-        self.mouse_over = -1
         
         # Colors
         self.bg_color = (20, 20, 40)
@@ -45,41 +109,12 @@ class Menu:
             rect.center = (WIDTH // 2, HEIGHT // 2 + i * 120)
             self.button_rects.append(rect)
     
-    def handle_input(self):
-        keys = pygame.key.get_pressed()
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_clicked = pygame.mouse.get_pressed()[0]
-        
-        # Check mouse hover
-        self.mouse_over = -1
-        for i, rect in enumerate(self.button_rects):
-            if rect.collidepoint(mouse_pos):
-                self.mouse_over = i
-                self.selected = i
-                if mouse_clicked:
-                    pygame.time.wait(100)
-                    return self.selected
-        
-        # Navigate menu with keyboard
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            self.selected = (self.selected - 1) % len(self.options)
-            pygame.time.wait(200)
-        elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            self.selected = (self.selected + 1) % len(self.options)
-            pygame.time.wait(200)
-        
-        # Select option with keyboard
-        if keys[pygame.K_RETURN] or keys[pygame.K_SPACE]:
-            return self.selected
-        
-        return None
-    
     def display(self):
         # Background
         self.display_surface.fill(self.bg_color)
         
         # Title
-        title_text = self.font_large.render('Project M', True, self.title_color)
+        title_text = text_cache.render(self.font_large, 'Project M', True, self.title_color)
         title_rect = title_text.get_rect(center=(WIDTH // 2, HEIGHT // 4))
         self.display_surface.blit(title_text, title_rect)
         
@@ -101,31 +136,28 @@ class Menu:
                 pygame.draw.rect(self.display_surface, (255, 255, 255), rect, 2)
             
             # Draw text
-            option_text = self.font_medium.render(option, True, self.text_color)
+            option_text = text_cache.render(self.font_medium, option, True, self.text_color)
             text_rect = option_text.get_rect(center=rect.center)
             self.display_surface.blit(option_text, text_rect)
         
         # Instructions
-        instructions = self.font_small.render('Use Arrow Keys/WASD, Enter/Space or Click to select', True, (150, 150, 150))
+        instructions = text_cache.render(self.font_small, 'Use Arrow Keys/WASD, Enter/Space or Click to select', True, (150, 150, 150))
         instructions_rect = instructions.get_rect(center=(WIDTH // 2, HEIGHT - 50))
         self.display_surface.blit(instructions, instructions_rect)
 
-class PauseMenu:
+class PauseMenu(MenuScreen):
     def __init__(self):
         self.display_surface = pygame.display.get_surface()
-        self.font_large = pygame.font.Font(None, 80)
-        self.font_medium = pygame.font.Font(None, 50)
-        self.font_small = pygame.font.Font(None, 30)
+        self.font_large = assets.font(None, 80)
+        self.font_medium = assets.font(None, 50)
+        self.font_small = assets.font(None, 30)
         
         # Load UI assets
         ui_path = os.path.join("assets", "Tiny Swords", "Tiny Swords (Update 010)", "UI")
         try:
-            self.button_normal = pygame.image.load(os.path.join(ui_path, "Buttons", "Button_Blue.png")).convert_alpha()
-            self.button_hover = pygame.image.load(os.path.join(ui_path, "Buttons", "Button_Hover.png")).convert_alpha()
-            button_width = 300
-            button_height = 80
-            self.button_normal = pygame.transform.scale(self.button_normal, (button_width, button_height))
-            self.button_hover = pygame.transform.scale(self.button_hover, (button_width, button_height))
+            button_size = (300, 80)
+            self.button_normal = assets.image(os.path.join(ui_path, "Buttons", "Button_Blue.png"), button_size)
+            self.button_hover = assets.image(os.path.join(ui_path, "Buttons", "Button_Hover.png"), button_size)
             self.has_button_sprites = True
         except:
             self.has_button_sprites = False
@@ -133,6 +165,7 @@ class PauseMenu:
         # Menu options
         self.options = ['Continue', 'Main Menu', 'Quit']
         self.selected = 0
+        self.background = None  # Game frame under the menu, darkened once in freeze()
         
         # Colors
         self.title_color = (255, 215, 0)
@@ -145,42 +178,18 @@ class PauseMenu:
             rect.center = (WIDTH // 2, HEIGHT // 2 - 50 + i * 100)
             self.button_rects.append(rect)
     
-    def handle_input(self):
-        keys = pygame.key.get_pressed()
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_clicked = pygame.mouse.get_pressed()[0]
-        
-        # Check mouse hover
-        for i, rect in enumerate(self.button_rects):
-            if rect.collidepoint(mouse_pos):
-                self.selected = i
-                if mouse_clicked:
-                    pygame.time.wait(100)
-                    return self.selected
-        
-        # Navigate menu
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            self.selected = (self.selected - 1) % len(self.options)
-            pygame.time.wait(200)
-        elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            self.selected = (self.selected + 1) % len(self.options)
-            pygame.time.wait(200)
-        
-        # Select option
-        if keys[pygame.K_RETURN] or keys[pygame.K_SPACE]:
-            return self.selected
-        
-        return None
+    def freeze(self, frame):
+        """Keep a darkened copy of the last game frame to draw the menu over"""
+        self.background = frozen_frame(frame, (0, 0, 0), 180)
     
     def display(self):
-        # Semi-transparent overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT))
-        overlay.set_alpha(180)
-        overlay.fill((0, 0, 0))
-        self.display_surface.blit(overlay, (0, 0))
+        # Darkened game frame
+        if self.background is None:
+            self.freeze(self.display_surface)
+        self.display_surface.blit(self.background, (0, 0))
         
         # Title
-        title_text = self.font_large.render('PAUSED', True, self.title_color)
+        title_text = text_cache.render(self.font_large, 'PAUSED', True, self.title_color)
         title_rect = title_text.get_rect(center=(WIDTH // 2, HEIGHT // 4))
         self.display_surface.blit(title_text, title_rect)
         
@@ -198,31 +207,28 @@ class PauseMenu:
                 pygame.draw.rect(self.display_surface, (255, 255, 255), rect, 2)
             
             # Draw text
-            option_text = self.font_medium.render(option, True, self.text_color)
+            option_text = text_cache.render(self.font_medium, option, True, self.text_color)
             text_rect = option_text.get_rect(center=rect.center)
             self.display_surface.blit(option_text, text_rect)
         
         # Instructions
-        instructions = self.font_small.render('Press ESC to continue', True, (150, 150, 150))
+        instructions = text_cache.render(self.font_small, 'Press ESC to continue', True, (150, 150, 150))
         instructions_rect = instructions.get_rect(center=(WIDTH // 2, HEIGHT - 50))
         self.display_surface.blit(instructions, instructions_rect)
 
-class GameOverMenu:
+class GameOverMenu(MenuScreen):
     def __init__(self):
         self.display_surface = pygame.display.get_surface()
-        self.font_large = pygame.font.Font(None, 100)
-        self.font_medium = pygame.font.Font(None, 50)
-        self.font_small = pygame.font.Font(None, 30)
+        self.font_large = assets.font(None, 100)
+        self.font_medium = assets.font(None, 50)
+        self.font_small = assets.font(None, 30)
         
         # Load UI assets
         ui_path = os.path.join("assets", "Tiny Swords", "Tiny Swords (Update 010)", "UI")
         try:
-            self.button_normal = pygame.image.load(os.path.join(ui_path, "Buttons", "Button_Red.png")).convert_alpha()
-            self.button_hover = pygame.image.load(os.path.join(ui_path, "Buttons", "Button_Hover.png")).convert_alpha()
-            button_width = 300
-            button_height = 80
-            self.button_normal = pygame.transform.scale(self.button_normal, (button_width, button_height))
-            self.button_hover = pygame.transform.scale(self.button_hover, (button_width, button_height))
+            button_size = (300, 80)
+            self.button_normal = assets.image(os.path.join(ui_path, "Buttons", "Button_Red.png"), button_size)
+            self.button_hover = assets.image(os.path.join(ui_path, "Buttons", "Button_Hover.png"), button_size)
             self.has_button_sprites = True
         except:
             self.has_button_sprites = False
@@ -230,6 +236,7 @@ class GameOverMenu:
         # Menu options
         self.options = ['Restart', 'Main Menu', 'Quit']
         self.selected = 0
+        self.background = None  # Game frame under the menu, darkened once in freeze()
         
         # Colors
         self.title_color = (220, 20, 60)  # Crimson red
@@ -242,42 +249,18 @@ class GameOverMenu:
             rect.center = (WIDTH // 2, HEIGHT // 2 + 50 + i * 100)
             self.button_rects.append(rect)
     
-    def handle_input(self):
-        keys = pygame.key.get_pressed()
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_clicked = pygame.mouse.get_pressed()[0]
-        
-        # Check mouse hover
-        for i, rect in enumerate(self.button_rects):
-            if rect.collidepoint(mouse_pos):
-                self.selected = i
-                if mouse_clicked:
-                    pygame.time.wait(100)
-                    return self.selected
-        
-        # Navigate menu
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            self.selected = (self.selected - 1) % len(self.options)
-            pygame.time.wait(200)
-        elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            self.selected = (self.selected + 1) % len(self.options)
-            pygame.time.wait(200)
-        
-        # Select option
-        if keys[pygame.K_RETURN] or keys[pygame.K_SPACE]:
-            return self.selected
-        
-        return None
+    def freeze(self, frame):
+        """Keep a copy of the last game frame under a dark red overlay to draw the menu over"""
+        self.background = frozen_frame(frame, (20, 0, 0), 200)
     
     def display(self):
-        # Dark red overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT))
-        overlay.set_alpha(200)
-        overlay.fill((20, 0, 0))
-        self.display_surface.blit(overlay, (0, 0))
+        # Game frame under a dark red overlay
+        if self.background is None:
+            self.freeze(self.display_surface)
+        self.display_surface.blit(self.background, (0, 0))
         
         # Game Over Title
-        title_text = self.font_large.render('GAME OVER', True, self.title_color)
+        title_text = text_cache.render(self.font_large, 'GAME OVER', True, self.title_color)
         title_rect = title_text.get_rect(center=(WIDTH // 2, HEIGHT // 3))
         self.display_surface.blit(title_text, title_rect)
         
@@ -295,7 +278,7 @@ class GameOverMenu:
                 pygame.draw.rect(self.display_surface, (255, 255, 255), rect, 2)
             
             # Draw text
-            option_text = self.font_medium.render(option, True, self.text_color)
+            option_text = text_cache.render(self.font_medium, option, True, self.text_color)
             text_rect = option_text.get_rect(center=rect.center)
             self.display_surface.blit(option_text, text_rect)
 
@@ -303,51 +286,54 @@ class UI:
     def __init__(self, player):
         self.player = player
         self.display_surface = pygame.display.get_surface()
-        self.font = pygame.font.Font(None, 30)
-        self.font_large = pygame.font.Font(None, 40)
+        self.font = assets.font(None, 30)
+        self.font_large = assets.font(None, 40)
+        
+        # HUD panels are drawn into cached surfaces, rebuilt only when the player's stats change
+        self.bars = None  # Health and stamina bars, blitted at (20, 20)
+        self.level_panel = None  # Level and EXP, blitted in the bottom right corner
+        self.dirty = True
+        player.stats_changed.append(self.mark_dirty)
 
-    def draw_health_bar(self):
+    def mark_dirty(self):
+        self.dirty = True
+
+    def draw_health_bar(self, surface, x, y):
         bar_width = self.player.max_health * 2
         bar_height = 20
         health_ratio = self.player.health / self.player.max_health
-        pygame.draw.rect(self.display_surface, (100, 100, 100), (20, 20, bar_width, bar_height))
-        pygame.draw.rect(self.display_surface, (230, 30, 30), (20, 20, bar_width * health_ratio, bar_height))
+        pygame.draw.rect(surface, (100, 100, 100), (x, y, bar_width, bar_height))
+        pygame.draw.rect(surface, (230, 30, 30), (x, y, bar_width * health_ratio, bar_height))
         
         # Health text
-        health_text = self.font.render(f'HP: {int(self.player.health)}/{int(self.player.max_health)}', True, (255, 255, 255))
-        self.display_surface.blit(health_text, (25, 22))
+        health_text = text_cache.render(self.font, f'HP: {int(self.player.health)}/{int(self.player.max_health)}', True, (255, 255, 255))
+        surface.blit(health_text, (x + 5, y + 2))
 
-    def draw_stamina_bar(self):
+    def draw_stamina_bar(self, surface, x, y):
         bar_width = self.player.max_stamina * 2
         bar_height = 20
         stamina_ratio = self.player.stamina / self.player.max_stamina
-        pygame.draw.rect(self.display_surface, (100, 100, 100), (20, 50, bar_width, bar_height))
-        pygame.draw.rect(self.display_surface, (0, 255, 50), (20, 50, bar_width * stamina_ratio, bar_height))
+        pygame.draw.rect(surface, (100, 100, 100), (x, y, bar_width, bar_height))
+        pygame.draw.rect(surface, (0, 255, 50), (x, y, bar_width * stamina_ratio, bar_height))
         
         # Stamina text
-        stamina_text = self.font.render(f'SP: {int(self.player.stamina)}/{int(self.player.max_stamina)}', True, (255, 255, 255))
-        self.display_surface.blit(stamina_text, (25, 52))
+        stamina_text = text_cache.render(self.font, f'SP: {int(self.player.stamina)}/{int(self.player.max_stamina)}', True, (255, 255, 255))
+        surface.blit(stamina_text, (x + 5, y + 2))
     
-    def draw_level_and_exp(self):
-        """Draw level and exp bar in bottom right corner"""
-        screen_width = self.display_surface.get_width()
-        screen_height = self.display_surface.get_height()
-        
-        # Position in bottom right
+    def draw_level_and_exp(self, surface, panel_x, panel_y):
+        """Draw the level and exp panel with its top left at (panel_x, panel_y)"""
         panel_width = 250
         panel_height = 80
-        panel_x = screen_width - panel_width - 20
-        panel_y = screen_height - panel_height - 20
         
         # Background panel
         panel_rect = pygame.Rect(panel_x, panel_y, panel_width, panel_height)
-        pygame.draw.rect(self.display_surface, (40, 40, 60, 200), panel_rect)
-        pygame.draw.rect(self.display_surface, (100, 100, 120), panel_rect, 2)
+        pygame.draw.rect(surface, (40, 40, 60, 200), panel_rect)
+        pygame.draw.rect(surface, (100, 100, 120), panel_rect, 2)
         
         # Level text
-        level_text = self.font_large.render(f'Level {self.player.level}', True, (255, 215, 0))
+        level_text = text_cache.render(self.font_large, f'Level {self.player.level}', True, (255, 215, 0))
         level_rect = level_text.get_rect(centerx=panel_x + panel_width // 2, top=panel_y + 10)
-        self.display_surface.blit(level_text, level_rect)
+        surface.blit(level_text, level_rect)
         
         # EXP bar
         exp_bar_width = panel_width - 40
@@ -358,27 +344,43 @@ class UI:
         exp_ratio = self.player.exp / self.player.exp_to_next_level
         
         # Background bar
-        pygame.draw.rect(self.display_surface, (60, 60, 80), 
+        pygame.draw.rect(surface, (60, 60, 80), 
                         (exp_bar_x, exp_bar_y, exp_bar_width, exp_bar_height))
         # Progress bar
-        pygame.draw.rect(self.display_surface, (100, 200, 255), 
+        pygame.draw.rect(surface, (100, 200, 255), 
                         (exp_bar_x, exp_bar_y, exp_bar_width * exp_ratio, exp_bar_height))
         # Border
-        pygame.draw.rect(self.display_surface, (150, 150, 170), 
+        pygame.draw.rect(surface, (150, 150, 170), 
                         (exp_bar_x, exp_bar_y, exp_bar_width, exp_bar_height), 2)
         
         # EXP text
-        exp_text = self.font.render(f'{int(self.player.exp)}/{int(self.player.exp_to_next_level)} EXP', 
+        exp_text = text_cache.render(self.font, f'{int(self.player.exp)}/{int(self.player.exp_to_next_level)} EXP', 
                                      True, (255, 255, 255))
         exp_text_rect = exp_text.get_rect(center=(panel_x + panel_width // 2, exp_bar_y + exp_bar_height // 2))
-        self.display_surface.blit(exp_text, exp_text_rect)
+        surface.blit(exp_text, exp_text_rect)
+
+    def build_hud(self):
+        """Redraw the cached HUD panels from the player's current stats"""
+        # The gap between the bars shows the world, so that surface keeps per-pixel alpha
+        width = max(self.player.max_health, self.player.max_stamina) * 2
+        if self.bars is None or self.bars.get_width() != width:
+            self.bars = pygame.Surface((width, 50), pygame.SRCALPHA)
+        self.bars.fill((0, 0, 0, 0))
+        self.draw_health_bar(self.bars, 0, 0)
+        self.draw_stamina_bar(self.bars, 0, 30)
+        
+        if self.level_panel is None:
+            self.level_panel = pygame.Surface((250, 80))
+        self.draw_level_and_exp(self.level_panel, 0, 0)
+        self.dirty = False
 
-    def display_interaction_prompt(self):
+    def display_interaction_prompt(self, ready=True):
         screen_width = self.display_surface.get_width()
         screen_height = self.display_surface.get_height()
         
-        # Position at bottom center
-        prompt_text = self.font_large.render('Press E to BOSS', True, (255, 255, 255))
+        # Position at bottom center (the arena may still be loading in the background)
+        prompt = 'Press E to BOSS' if ready else 'Preparing the arena...'
+        prompt_text = text_cache.render(self.font_large, prompt, True, (255, 255, 255))
         prompt_rect = prompt_text.get_rect(center=(screen_width // 2, screen_height - 100))
         
         # Background box
@@ -421,16 +423,61 @@ class UI:
         pygame.draw.rect(self.display_surface, (255, 0, 0), (bar_x, bar_y, bar_width, bar_height), 3)
         
         # Boss name text
-        boss_name = self.font_large.render('BOSS', True, (255, 50, 50))
+        boss_name = text_cache.render(self.font_large, 'BOSS', True, (255, 50, 50))
         boss_name_rect = boss_name.get_rect(center=(screen_width // 2, bar_y - 20))
         self.display_surface.blit(boss_name, boss_name_rect)
         
         # Health text
-        health_text = self.font.render(f'{int(boss.health)}/{int(boss.max_health)}', True, (255, 255, 255))
+        health_text = text_cache.render(self.font, f'{int(boss.health)}/{int(boss.max_health)}', True, (255, 255, 255))
         health_text_rect = health_text.get_rect(center=(screen_width // 2, bar_y + bar_height // 2))
         self.display_surface.blit(health_text, health_text_rect)
 
     def display(self):
-        self.draw_health_bar()
-        self.draw_stamina_bar()
-        self.draw_level_and_exp()
\ No newline at end of file
+        if self.dirty:
+            self.build_hud()
+        self.display_surface.blit(self.bars, (20, 20))
+        # Bottom right corner
+        self.display_surface.blit(self.level_panel, (self.display_surface.get_width() - 270, self.display_surface.get_height() - 100))
+
+class ProfilerOverlay:
+    """Frame-time overlay listing rolling p50/p95/p99 per profiled phase"""
+    def __init__(self, refresh_interval=30):
+        self.display_surface = pygame.display.get_surface()
+        self.font = assets.font(None, 22)
+        self.refresh_interval = refresh_interval  # Ticks between text refreshes
+        self.last_refresh = -refresh_interval
+        self.panel = None
+
+    def build_panel(self):
+        rows = [('phase', 'p50', 'p95', 'p99')]
+        for name in sorted(profiler.history, key=lambda name: name != 'frame'):
+            rows.append((name,) + tuple(f'{ms:.2f}' for ms in profiler.percentiles(name)))
+        column_right = [0, 150, 210, 270]  # Name is left-aligned, timings right-aligned
+        counters = [(name, f'{value:.2f}' if isinstance(value, float) else str(value)) for name, value in sorted(profiler.counters.items())]
+
+        line_height = self.font.get_linesize()
+        self.panel = pygame.Surface((290, line_height * (len(rows) + len(counters) + 1) + 16), pygame.SRCALPHA)
+        self.panel.fill((0, 0, 0, 170))
+        for i, row in enumerate(rows):
+            y = 8 + i * line_height
+            for column, cell in enumerate(row):
+                text = self.font.render(cell, True, (255, 255, 255))
+                x = 10 if column == 0 else column_right[column] - text.get_width()
+                self.panel.blit(text, (x, y))
+        # Counters below the timings, value right-aligned with the last column
+        for i, (name, value) in enumerate(counters, len(rows)):
+            y = 8 + i * line_height
+            self.panel.blit(self.font.render(name, True, (200, 200, 255)), (10, y))
+            text = self.font.render(value, True, (200, 200, 255))
+            self.panel.blit(text, (column_right[-1] - text.get_width(), y))
+        hint = self.font.render('ms  |  F3: hide  F4: dump CSV', True, (150, 150, 150))
+        self.panel.blit(hint, (10, 8 + (len(rows) + len(counters)) * line_height))
+
+    def display(self):
+        if not profiler.enabled:
+            return
+        # Percentiles are re-rendered a few times per second, not every frame
+        if self.panel is None or profiler.ticks - self.last_refresh >= self.refresh_interval:
+            self.build_panel()
+            self.last_refresh = profiler.ticks
+        self.display_surface.blit(self.panel, (self.display_surface.get_width() - self.panel.get_width() - 10, 10))